@@ -0,0 +1,68 @@
+"""
+Prebuilt PRD check functions for the default repo set.
+
+Generated by scripts/build_prd_validator.py - do not edit by hand.
+"""
+try:
+    from .prd_validator import ValidationError, SEVERITY_ERROR, _story_path, _LazyMsg
+except ImportError:
+    from prd_validator import ValidationError, SEVERITY_ERROR, _story_path, _LazyMsg
+
+INPUTS_FINGERPRINT = '15271a3379eb92076863b3411114a85b'
+
+_MISSING = object()
+_valid_repos = frozenset(['android', 'api', 'backend', 'frontend', 'ios', 'mobile', 'web'])
+_valid_repos_sorted = ['android', 'api', 'backend', 'frontend', 'ios', 'mobile', 'web']
+_prd_type_0 = list
+_story_type_0 = str
+_story_type_1 = str
+_story_type_2 = str
+_story_type_3 = str
+_story_type_4 = list
+
+
+def check_schema(prd):
+    errors = []
+    prd_0 = prd.get('userStories', _MISSING)
+    if prd_0 is _MISSING:
+        errors.append(ValidationError(path='$.userStories', code='MISSING_FIELD', message="Required field 'userStories' is missing", severity=SEVERITY_ERROR))
+    elif not isinstance(prd_0, _prd_type_0):
+        errors.append(ValidationError(path='$.userStories', code='INVALID_TYPE', message="Field 'userStories' must be of type list", severity=SEVERITY_ERROR))
+    return errors
+
+
+def check_story(story, index, existing_ids, errors):
+    if not isinstance(story, dict):
+        errors.append(ValidationError(path=_story_path(index), code='INVALID_STORY_TYPE', message='Story must be an object', severity=SEVERITY_ERROR))
+        return
+    story_0 = story.get('id', _MISSING)
+    if story_0 is _MISSING:
+        errors.append(ValidationError(path=_story_path(index, '.id'), code='MISSING_FIELD', message="Story missing required field 'id'", severity=SEVERITY_ERROR))
+    elif not isinstance(story_0, _story_type_0):
+        errors.append(ValidationError(path=_story_path(index, '.id'), code='INVALID_TYPE', message="Story field 'id' must be of type str", severity=SEVERITY_ERROR))
+    story_1 = story.get('title', _MISSING)
+    if story_1 is _MISSING:
+        errors.append(ValidationError(path=_story_path(index, '.title'), code='MISSING_FIELD', message="Story missing required field 'title'", severity=SEVERITY_ERROR))
+    elif not isinstance(story_1, _story_type_1):
+        errors.append(ValidationError(path=_story_path(index, '.title'), code='INVALID_TYPE', message="Story field 'title' must be of type str", severity=SEVERITY_ERROR))
+    story_2 = story.get('description', _MISSING)
+    if story_2 is _MISSING:
+        errors.append(ValidationError(path=_story_path(index, '.description'), code='MISSING_FIELD', message="Story missing required field 'description'", severity=SEVERITY_ERROR))
+    elif not isinstance(story_2, _story_type_2):
+        errors.append(ValidationError(path=_story_path(index, '.description'), code='INVALID_TYPE', message="Story field 'description' must be of type str", severity=SEVERITY_ERROR))
+    story_3 = story.get('repo', _MISSING)
+    if story_3 is _MISSING:
+        errors.append(ValidationError(path=_story_path(index, '.repo'), code='MISSING_FIELD', message="Story missing required field 'repo'", severity=SEVERITY_ERROR))
+    elif not isinstance(story_3, _story_type_3):
+        errors.append(ValidationError(path=_story_path(index, '.repo'), code='INVALID_TYPE', message="Story field 'repo' must be of type str", severity=SEVERITY_ERROR))
+    story_4 = story.get('acceptanceCriteria', _MISSING)
+    if story_4 is _MISSING:
+        errors.append(ValidationError(path=_story_path(index, '.acceptanceCriteria'), code='MISSING_FIELD', message="Story missing required field 'acceptanceCriteria'", severity=SEVERITY_ERROR))
+    elif not isinstance(story_4, _story_type_4):
+        errors.append(ValidationError(path=_story_path(index, '.acceptanceCriteria'), code='INVALID_TYPE', message="Story field 'acceptanceCriteria' must be of type list", severity=SEVERITY_ERROR))
+    story_id = (None if story_0 is _MISSING else story_0)
+    if story_id and story_id in existing_ids:
+        errors.append(ValidationError(path=_story_path(index, '.id'), code='DUPLICATE_STORY_ID', message=_LazyMsg("Duplicate story ID: '{}'", story_id), severity=SEVERITY_ERROR))
+    repo = (None if story_3 is _MISSING else story_3)
+    if repo and (not isinstance(repo, str) or repo not in _valid_repos):
+        errors.append(ValidationError(path=_story_path(index, '.repo'), code='INVALID_CODEBASE', message=_LazyMsg("Repository '{}' not found in valid codebases. Valid options: {}", repo, _valid_repos_sorted), severity=SEVERITY_ERROR))
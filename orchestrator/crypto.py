@@ -4,6 +4,7 @@ Uses Fernet symmetric encryption with key from environment variable
 """
 import os
 import base64
+from functools import lru_cache
 from typing import Optional
 from cryptography.fernet import Fernet, InvalidToken
 
@@ -28,7 +29,12 @@ def get_encryption_key() -> bytes:
 
 def get_fernet() -> Fernet:
     """Get Fernet instance with encryption key"""
-    return Fernet(get_encryption_key())
+    return _fernet_for_key(get_encryption_key())
+
+
+@lru_cache(maxsize=8)
+def _fernet_for_key(key: bytes) -> Fernet:
+    return Fernet(key)
 
 
 def encrypt_value(plaintext: str) -> str:
@@ -62,9 +68,20 @@ def decrypt_value(ciphertext: str) -> Optional[str]:
     if not ciphertext:
         return None
 
+    return _decrypt_cached(ciphertext, get_encryption_key())
+
+
+@lru_cache(maxsize=512)
+def _decrypt_cached(ciphertext: str, key: bytes) -> Optional[str]:
+    """
+    Decrypt with a given key, memoized.
+
+    Workers decrypt the same stored tokens for every job. Every encryption
+    produces a fresh ciphertext, so a rotated secret never hits a stale
+    entry; including the key covers a changed ENCRYPTION_KEY.
+    """
     try:
-        f = get_fernet()
-        decrypted = f.decrypt(ciphertext.encode())
+        decrypted = _fernet_for_key(key).decrypt(ciphertext.encode())
         return decrypted.decode()
     except InvalidToken:
         # Invalid token - either corrupted or wrong key
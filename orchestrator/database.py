@@ -2,10 +2,10 @@
 Database initialization and session management
 """
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from passlib.context import CryptContext
-from models import Base, User
+from models import Base, User, AgentExecution
 
 # Database URL from environment or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ralph_advanced.db")
@@ -28,15 +28,40 @@ pwd_context = CryptContext(
 )
 
 
+# Columns added to existing tables since they were first created;
+# create_all only creates missing tables, so these are added in place
+ADDED_COLUMNS = (
+    AgentExecution.__table__.c.input_hash,
+    AgentExecution.__table__.c.output_hash,
+)
+
+
+def _add_missing_columns():
+    """Add any ADDED_COLUMNS that an existing database does not have yet"""
+    existing = {}
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for column in ADDED_COLUMNS:
+            table = column.table.name
+            if table not in existing:
+                existing[table] = {c["name"] for c in inspector.get_columns(table)}
+            if column.name not in existing[table]:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+                print(f"✓ Added column {table}.{column.name}")
+
+
 def init_db():
     """Initialize database and create tables"""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
     
     # Create default admin user if not exists
     db = SessionLocal()
     try:
-        admin = db.query(User).filter(User.username == "Admin").first()
-        if not admin:
+        # Existence check first; bcrypt only runs when the user must be created
+        admin_exists = db.query(User.id).filter(User.username == "Admin").first() is not None
+        if not admin_exists:
             # Password: 123Test@2026!
             hashed_password = pwd_context.hash("123Test@2026!")
             admin = User(username="Admin", password_hash=hashed_password)
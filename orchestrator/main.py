@@ -4,8 +4,9 @@ Ralph-Advanced Orchestrator - Main FastAPI Application
 import json
 import os
 import sys
+import msgpack
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Set
 from fastapi import FastAPI, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
@@ -62,20 +63,51 @@ async def startup_event():
 
 # WebSocket connection manager
 class ConnectionManager:
+    # Subprotocol clients request to get MessagePack binary frames instead of JSON text
+    MSGPACK_SUBPROTOCOL = "msgpack"
+
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self.msgpack_connections: Set[WebSocket] = set()
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+        if self.MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", []):
+            await websocket.accept(subprotocol=self.MSGPACK_SUBPROTOCOL)
+            self.msgpack_connections.add(websocket)
+        else:
+            await websocket.accept()
         self.active_connections.append(websocket)
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
+        self.msgpack_connections.discard(websocket)
+
+    async def receive(self, websocket: WebSocket) -> dict:
+        if websocket in self.msgpack_connections:
+            return msgpack.unpackb(await websocket.receive_bytes())
+        return await websocket.receive_json()
+
+    async def send(self, websocket: WebSocket, message: dict):
+        if websocket in self.msgpack_connections:
+            await websocket.send_bytes(msgpack.packb(message))
+        else:
+            await websocket.send_json(message)
 
     async def broadcast(self, message: dict):
+        # Encode once per wire format rather than once per connection
+        text = None
+        packed = None
         for connection in self.active_connections:
             try:
-                await connection.send_json(message)
+                if connection in self.msgpack_connections:
+                    if packed is None:
+                        packed = msgpack.packb(message)
+                    await connection.send_bytes(packed)
+                else:
+                    if text is None:
+                        # Same encoding as WebSocket.send_json
+                        text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+                    await connection.send_text(text)
             except:
                 pass
 
@@ -234,11 +266,12 @@ async def create_feature(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Parse PRD JSON to count stories
+    # Parse PRD JSON once; reused below to count and create stories
     try:
         prd_data = json.loads(feature.prd_json)
         total_stories = len(prd_data.get("userStories", []))
     except:
+        prd_data = None
         total_stories = 0
     
     db_feature = Feature(
@@ -255,7 +288,8 @@ async def create_feature(
     
     # Create story records from PRD
     try:
-        prd_data = json.loads(feature.prd_json)
+        if prd_data is None:
+            raise ValueError("Invalid PRD JSON")
         for story_data in prd_data.get("userStories", []):
             story = Story(
                 feature_id=db_feature.id,
@@ -263,7 +297,7 @@ async def create_feature(
                 repo=story_data.get("repo"),
                 title=story_data.get("title"),
                 description=story_data.get("description"),
-                acceptance_criteria=json.dumps(story_data.get("acceptanceCriteria", [])),
+                acceptance_criteria=story_data.get("acceptanceCriteria", []),
                 priority=story_data.get("priority", 1),
                 dependencies=json.dumps(story_data.get("dependencies", []))
             )
@@ -677,21 +711,8 @@ async def validate_prd(
 
     result = prd_validator.validate(request.prd_json, project_codebases)
 
-    return PRDValidationResponse(
-        is_valid=result.is_valid,
-        errors=[{
-            "path": e.path,
-            "code": e.code,
-            "message": e.message,
-            "severity": e.severity
-        } for e in result.errors],
-        warnings=[{
-            "path": w.path,
-            "code": w.code,
-            "message": w.message,
-            "severity": w.severity
-        } for w in result.warnings]
-    )
+    # to_dict() renders the lazily formatted messages; response_model validates the dict once
+    return result.to_dict()
 
 
 @app.post("/api/prd/evaluate", response_model=PRDEvaluationResponse)
@@ -703,22 +724,7 @@ async def evaluate_prd(
     """Evaluate PRD quality and provide score"""
     result = prd_evaluator.evaluate(request.prd_json)
 
-    return PRDEvaluationResponse(
-        score=result.score,
-        grade=result.grade,
-        issues=[{
-            "category": i.category,
-            "story_id": i.story_id,
-            "issue": i.issue,
-            "suggestion": i.suggestion,
-            "impact": i.impact
-        } for i in result.issues],
-        breakdown={
-            "clarity": result.breakdown.clarity,
-            "dependencies": result.breakdown.dependencies,
-            "feasibility": result.breakdown.feasibility
-        }
-    )
+    return result.to_dict()
 
 
 @app.post("/api/prd/plan", response_model=PRDPlanningResponse)
@@ -730,19 +736,7 @@ async def plan_prd(
     """Analyze PRD dependencies and generate execution plan"""
     result = prd_planner.plan(request.prd_json)
 
-    return PRDPlanningResponse(
-        execution_order=result.execution_order,
-        phases=[{
-            "phase_number": p.phase_number,
-            "stories": p.stories,
-            "can_parallelize": p.can_parallelize,
-            "rationale": p.rationale
-        } for p in result.phases],
-        critical_path=result.critical_path,
-        critical_path_length=result.critical_path_length,
-        parallelization_opportunities=result.parallelization_opportunities,
-        recommendations=result.recommendations
-    )
+    return result.to_dict()
 
 
 @app.post("/api/prd/analyze", response_model=PRDAnalysisResponse)
@@ -766,52 +760,11 @@ async def analyze_prd(
     evaluation_result = prd_evaluator.evaluate(request.prd_json)
     planning_result = prd_planner.plan(request.prd_json)
 
-    return PRDAnalysisResponse(
-        validation=PRDValidationResponse(
-            is_valid=validation_result.is_valid,
-            errors=[{
-                "path": e.path,
-                "code": e.code,
-                "message": e.message,
-                "severity": e.severity
-            } for e in validation_result.errors],
-            warnings=[{
-                "path": w.path,
-                "code": w.code,
-                "message": w.message,
-                "severity": w.severity
-            } for w in validation_result.warnings]
-        ),
-        evaluation=PRDEvaluationResponse(
-            score=evaluation_result.score,
-            grade=evaluation_result.grade,
-            issues=[{
-                "category": i.category,
-                "story_id": i.story_id,
-                "issue": i.issue,
-                "suggestion": i.suggestion,
-                "impact": i.impact
-            } for i in evaluation_result.issues],
-            breakdown={
-                "clarity": evaluation_result.breakdown.clarity,
-                "dependencies": evaluation_result.breakdown.dependencies,
-                "feasibility": evaluation_result.breakdown.feasibility
-            }
-        ),
-        planning=PRDPlanningResponse(
-            execution_order=planning_result.execution_order,
-            phases=[{
-                "phase_number": p.phase_number,
-                "stories": p.stories,
-                "can_parallelize": p.can_parallelize,
-                "rationale": p.rationale
-            } for p in planning_result.phases],
-            critical_path=planning_result.critical_path,
-            critical_path_length=planning_result.critical_path_length,
-            parallelization_opportunities=planning_result.parallelization_opportunities,
-            recommendations=planning_result.recommendations
-        )
-    )
+    return {
+        "validation": validation_result.to_dict(),
+        "evaluation": evaluation_result.to_dict(),
+        "planning": planning_result.to_dict()
+    }
 
 
 # ============================================================================
@@ -896,25 +849,32 @@ async def get_dashboard_stats(
     db: Session = Depends(get_db)
 ):
     """Get dashboard statistics"""
-    total_projects = db.query(func.count(Project.id)).scalar()
-    active_projects = db.query(func.count(Project.id)).filter(Project.status == "running").scalar()
-    total_features = db.query(func.count(Feature.id)).scalar()
-    active_features = db.query(func.count(Feature.id)).filter(Feature.status == "in_progress").scalar()
-    total_stories = db.query(func.count(Story.id)).scalar()
-    completed_stories = db.query(func.count(Story.id)).filter(Story.status == "done").scalar()
-    pending_stories = db.query(func.count(Story.id)).filter(Story.status == "pending").scalar()
-    failed_stories = db.query(func.count(Story.id)).filter(Story.status == "failed").scalar()
+    # One conditional-aggregate scan per table instead of a COUNT query per figure
+    total_projects, active_projects = db.query(
+        func.count(Project.id),
+        func.count(Project.id).filter(Project.status == "running")
+    ).one()
+    total_features, active_features = db.query(
+        func.count(Feature.id),
+        func.count(Feature.id).filter(Feature.status == "in_progress")
+    ).one()
+    total_stories, completed_stories, pending_stories, failed_stories = db.query(
+        func.count(Story.id),
+        func.count(Story.id).filter(Story.status == "done"),
+        func.count(Story.id).filter(Story.status == "pending"),
+        func.count(Story.id).filter(Story.status == "failed")
+    ).one()
     
-    return DashboardStats(
-        total_projects=total_projects or 0,
-        active_projects=active_projects or 0,
-        total_features=total_features or 0,
-        active_features=active_features or 0,
-        total_stories=total_stories or 0,
-        completed_stories=completed_stories or 0,
-        pending_stories=pending_stories or 0,
-        failed_stories=failed_stories or 0
-    )
+    return {
+        "total_projects": total_projects or 0,
+        "active_projects": active_projects or 0,
+        "total_features": total_features or 0,
+        "active_features": active_features or 0,
+        "total_stories": total_stories or 0,
+        "completed_stories": completed_stories or 0,
+        "pending_stories": pending_stories or 0,
+        "failed_stories": failed_stories or 0
+    }
 
 
 @app.get("/api/features/{feature_id}/stats", response_model=FeatureStats)
@@ -928,33 +888,29 @@ async def get_feature_stats(
     if not feature:
         raise HTTPException(status_code=404, detail="Feature not found")
     
-    total_stories = db.query(func.count(Story.id)).filter(Story.feature_id == feature_id).scalar() or 0
-    completed_stories = db.query(func.count(Story.id)).filter(
-        Story.feature_id == feature_id, Story.status == "done"
-    ).scalar() or 0
-    pending_stories = db.query(func.count(Story.id)).filter(
-        Story.feature_id == feature_id, Story.status == "pending"
-    ).scalar() or 0
-    in_progress_stories = db.query(func.count(Story.id)).filter(
-        Story.feature_id == feature_id, Story.status == "in_progress"
-    ).scalar() or 0
-    failed_stories = db.query(func.count(Story.id)).filter(
-        Story.feature_id == feature_id, Story.status == "failed"
-    ).scalar() or 0
+    # Single pass over the feature's stories (idx_stories_feature_id_status);
+    # count(*) rather than count(id) so the index alone can answer it
+    total_stories, completed_stories, pending_stories, in_progress_stories, failed_stories = db.query(
+        func.count(),
+        func.count().filter(Story.status == "done"),
+        func.count().filter(Story.status == "pending"),
+        func.count().filter(Story.status == "in_progress"),
+        func.count().filter(Story.status == "failed")
+    ).filter(Story.feature_id == feature_id).one()
     
     progress_percentage = (completed_stories / total_stories * 100) if total_stories > 0 else 0
     
-    return FeatureStats(
-        feature_id=feature_id,
-        feature_name=feature.name,
-        total_stories=total_stories,
-        completed_stories=completed_stories,
-        pending_stories=pending_stories,
-        in_progress_stories=in_progress_stories,
-        failed_stories=failed_stories,
-        progress_percentage=round(progress_percentage, 2),
-        estimated_time_remaining=None  # TODO: Calculate based on average story time
-    )
+    return {
+        "feature_id": feature_id,
+        "feature_name": feature.name,
+        "total_stories": total_stories,
+        "completed_stories": completed_stories,
+        "pending_stories": pending_stories,
+        "in_progress_stories": in_progress_stories,
+        "failed_stories": failed_stories,
+        "progress_percentage": round(progress_percentage, 2),
+        "estimated_time_remaining": None  # TODO: Calculate based on average story time
+    }
 
 
 # ============================================================================
@@ -1001,11 +957,11 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         while True:
             # Keep connection alive and receive commands
-            data = await websocket.receive_json()
+            data = await manager.receive(websocket)
             command = data.get("command")
             
             if command == "ping":
-                await websocket.send_json({"type": "pong"})
+                await manager.send(websocket, {"type": "pong"})
             
             # Handle other commands (pause, resume, abort) here
             
@@ -1,15 +1,53 @@
 """
 Database models for Ralph-Advanced
 """
+import json
 import uuid
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Boolean, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
+
+try:
+    # Optional C-accelerated codec for JSON-encoded columns
+    import orjson
+
+    def _dumps(value) -> str:
+        return orjson.dumps(value).decode()
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
 
 Base = declarative_base()
 
 
+class JSONText(TypeDecorator):
+    """
+    JSON value stored as text.
+
+    Rows keep the same TEXT encoding as before, so existing data needs no
+    migration; the ORM hands back the parsed value. Text that is not valid
+    JSON is returned as-is rather than failing the whole query.
+    """
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return _dumps(value)
+
+    def process_result_value(self, value, dialect):
+        if not value:
+            return None
+        try:
+            return _loads(value)
+        except ValueError:
+            return value
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -141,7 +179,7 @@ class Story(Base):
     codebase_id = Column(Integer, ForeignKey("codebases.id"))
     title = Column(String(500), nullable=False)
     description = Column(Text)
-    acceptance_criteria = Column(Text)  # JSON array
+    acceptance_criteria = Column(JSONText)  # JSON array
     priority = Column(Integer, default=1)
     status = Column(String(50), default="pending")  # pending, in_progress, review, testing, rework, done, failed
     dependencies = Column(Text)  # JSON array
@@ -167,6 +205,8 @@ class Story(Base):
         Index("idx_stories_feature_id", "feature_id"),
         Index("idx_stories_status", "status"),
         Index("idx_stories_codebase_id", "codebase_id"),
+        # Covers per-feature status counts (feature stats) without touching the table
+        Index("idx_stories_feature_id_status", "feature_id", "status"),
     )
 
 
@@ -198,8 +238,10 @@ class AgentExecution(Base):
     started_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime)
     status = Column(String(50), default="running")  # running, success, failed
-    input_data = Column(Text)  # JSON
-    output_data = Column(Text)  # JSON
+    input_data = Column(Text)  # JSON (legacy rows; new rows use input_hash)
+    output_data = Column(Text)  # JSON (legacy rows; new rows use output_hash)
+    input_hash = Column(String(64), ForeignKey("execution_payloads.hash"))  # SHA-256 of the input JSON
+    output_hash = Column(String(64), ForeignKey("execution_payloads.hash"))  # SHA-256 of the output JSON
     error_message = Column(Text)
     duration_seconds = Column(Integer)
     # What and why for attribution
@@ -209,6 +251,19 @@ class AgentExecution(Base):
     story = relationship("Story", back_populates="agent_executions")
     quality_gate_results = relationship("QualityGateResult", back_populates="agent_execution")
     git_commits = relationship("GitCommit", back_populates="agent_execution")
+    # Loaded on first access only
+    input_payload = relationship("ExecutionPayload", foreign_keys=[input_hash], lazy="select")
+    output_payload = relationship("ExecutionPayload", foreign_keys=[output_hash], lazy="select")
+
+    @property
+    def input_json(self):
+        """Input JSON, from the payload table or the legacy column"""
+        return self.input_payload.body if self.input_payload else self.input_data
+
+    @property
+    def output_json(self):
+        """Output JSON, from the payload table or the legacy column"""
+        return self.output_payload.body if self.output_payload else self.output_data
 
     __table_args__ = (
         Index("idx_agent_executions_story_id", "story_id"),
@@ -216,6 +271,15 @@ class AgentExecution(Base):
     )
 
 
+class ExecutionPayload(Base):
+    """Agent execution input/output JSON, stored once per distinct content"""
+    __tablename__ = "execution_payloads"
+
+    hash = Column(String(64), primary_key=True)  # SHA-256 hex of body
+    body = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class QualityGateResult(Base):
     __tablename__ = "quality_gate_results"
 
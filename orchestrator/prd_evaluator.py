@@ -4,7 +4,7 @@ PRD Quality Evaluator - Scores PRD quality and provides improvement suggestions
 import json
 import re
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from collections import defaultdict
 
 
@@ -17,6 +17,15 @@ class QualityIssue:
     suggestion: str
     impact: int  # Points deducted
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "category": self.category,
+            "story_id": self.story_id,
+            "issue": self.issue,
+            "suggestion": self.suggestion,
+            "impact": self.impact
+        }
+
 
 @dataclass
 class QualityBreakdown:
@@ -25,6 +34,13 @@ class QualityBreakdown:
     dependencies: int  # 0-100
     feasibility: int  # 0-100
 
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "clarity": self.clarity,
+            "dependencies": self.dependencies,
+            "feasibility": self.feasibility
+        }
+
 
 @dataclass
 class QualityResult:
@@ -38,8 +54,8 @@ class QualityResult:
         return {
             "score": self.score,
             "grade": self.grade,
-            "issues": [asdict(i) for i in self.issues],
-            "breakdown": asdict(self.breakdown)
+            "issues": [i.to_dict() for i in self.issues],
+            "breakdown": self.breakdown.to_dict()
         }
 
 
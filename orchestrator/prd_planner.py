@@ -2,9 +2,13 @@
 PRD Planner - Analyzes dependencies and recommends optimal execution order
 """
 import json
+import hashlib
+import threading
+from itertools import islice
+from operator import itemgetter
 from typing import Dict, List, Set, Tuple, Optional
-from dataclasses import dataclass, asdict
-from collections import defaultdict, deque
+from dataclasses import dataclass
+from collections import defaultdict, deque, OrderedDict
 
 
 @dataclass
@@ -15,6 +19,14 @@ class ExecutionPhase:
     can_parallelize: bool
     rationale: str
 
+    def to_dict(self) -> Dict:
+        return {
+            "phase_number": self.phase_number,
+            "stories": list(self.stories),
+            "can_parallelize": self.can_parallelize,
+            "rationale": self.rationale
+        }
+
 
 @dataclass
 class PlanningResult:
@@ -29,7 +41,7 @@ class PlanningResult:
     def to_dict(self) -> Dict:
         return {
             "execution_order": self.execution_order,
-            "phases": [asdict(p) for p in self.phases],
+            "phases": [p.to_dict() for p in self.phases],
             "critical_path": self.critical_path,
             "critical_path_length": self.critical_path_length,
             "parallelization_opportunities": self.parallelization_opportunities,
@@ -46,8 +58,18 @@ class PRDPlanner:
     - Critical path analysis
     - Phase grouping for parallel execution
     - Recommendations for optimization
+
+    Graph analysis for recently planned PRDs is memoized by content hash,
+    so re-planning the same PRD skips parsing and graph construction.
     """
 
+    # Number of PRD analyses kept in the per-instance LRU cache
+    ANALYSIS_CACHE_SIZE = 16
+
+    def __init__(self):
+        self._analysis_cache: "OrderedDict[bytes, Tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
     def plan(self, prd_json: str) -> PlanningResult:
         """
         Generate execution plan for PRD.
@@ -58,65 +80,102 @@ class PRDPlanner:
         Returns:
             PlanningResult with execution order, phases, and recommendations
         """
-        try:
-            prd = json.loads(prd_json)
-        except json.JSONDecodeError:
-            return PlanningResult(
-                execution_order=[],
-                phases=[],
-                critical_path=[],
-                critical_path_length=0,
-                parallelization_opportunities=[],
-                recommendations=["Error: Invalid JSON format"]
-            )
+        prd_hash = hashlib.blake2b(prd_json.encode(), digest_size=16).digest()
+        analysis = self._get_cached_analysis(prd_hash)
+
+        if analysis is None:
+            try:
+                prd = json.loads(prd_json)
+            except json.JSONDecodeError:
+                return PlanningResult(
+                    execution_order=[],
+                    phases=[],
+                    critical_path=[],
+                    critical_path_length=0,
+                    parallelization_opportunities=[],
+                    recommendations=["Error: Invalid JSON format"]
+                )
 
-        stories = prd.get("userStories", [])
-        if not stories:
-            return PlanningResult(
-                execution_order=[],
-                phases=[],
-                critical_path=[],
-                critical_path_length=0,
-                parallelization_opportunities=[],
-                recommendations=["No user stories found in PRD"]
-            )
+            stories = prd.get("userStories", [])
+            if not stories:
+                return PlanningResult(
+                    execution_order=[],
+                    phases=[],
+                    critical_path=[],
+                    critical_path_length=0,
+                    parallelization_opportunities=[],
+                    recommendations=["No user stories found in PRD"]
+                )
+
+            # Build dependency graph
+            graph, reverse_graph, dep_signatures = self._build_graphs(stories)
+
+            # Get story metadata
+            story_meta = self._extract_story_metadata(stories)
 
-        # Build dependency graph
-        graph, reverse_graph = self._build_graphs(stories)
+            # Topological sort for execution order
+            execution_order = self._topological_sort(graph)
 
-        # Get story metadata
-        story_meta = self._extract_story_metadata(stories)
+            # Find critical path
+            critical_path, cp_length = self._find_critical_path(graph, story_meta)
 
-        # Topological sort for execution order
-        execution_order = self._topological_sort(graph)
+            analysis = (
+                stories, graph, reverse_graph, dep_signatures,
+                story_meta, execution_order, critical_path, cp_length
+            )
+            self._cache_analysis(prd_hash, analysis)
 
-        # Find critical path
-        critical_path, cp_length = self._find_critical_path(graph, story_meta)
+        (stories, graph, reverse_graph, dep_signatures,
+         story_meta, execution_order, critical_path, cp_length) = analysis
 
         # Group into phases
         phases = self._create_phases(graph, story_meta)
 
         # Find parallelization opportunities
-        parallel_groups = self._find_parallel_groups(graph)
+        parallel_groups = self._find_parallel_groups(dep_signatures)
 
         # Generate recommendations
         recommendations = self._generate_recommendations(
             stories, story_meta, phases, critical_path, parallel_groups, reverse_graph
         )
 
+        # Copy cached lists so callers can't mutate the memoized analysis
         return PlanningResult(
-            execution_order=execution_order,
+            execution_order=list(execution_order),
             phases=phases,
-            critical_path=critical_path,
+            critical_path=list(critical_path),
             critical_path_length=cp_length,
             parallelization_opportunities=parallel_groups,
             recommendations=recommendations
         )
 
-    def _build_graphs(self, stories: List[Dict]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
-        """Build forward and reverse dependency graphs"""
+    def _get_cached_analysis(self, prd_hash: bytes) -> Optional[Tuple]:
+        """Return memoized graph analysis for a PRD hash, if present"""
+        with self._cache_lock:
+            analysis = self._analysis_cache.get(prd_hash)
+            if analysis is not None:
+                self._analysis_cache.move_to_end(prd_hash)
+            return analysis
+
+    def _cache_analysis(self, prd_hash: bytes, analysis: Tuple) -> None:
+        """Store graph analysis, evicting the least recently used entry"""
+        with self._cache_lock:
+            self._analysis_cache[prd_hash] = analysis
+            self._analysis_cache.move_to_end(prd_hash)
+            while len(self._analysis_cache) > self.ANALYSIS_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+
+    def _build_graphs(
+        self,
+        stories: List[Dict]
+    ) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], Dict[str, Tuple[str, ...]]]:
+        """
+        Build forward and reverse dependency graphs, plus a canonical
+        (sorted) dependency signature per story.
+        """
         graph: Dict[str, List[str]] = {}
-        reverse_graph: Dict[str, List[str]] = defaultdict(list)
+        dep_signatures: Dict[str, Tuple[str, ...]] = {}
+        reverse_graph: Dict[str, List[str]] = {}
 
         for story in stories:
             story_id = story.get("id")
@@ -128,11 +187,12 @@ class PRDPlanner:
                 deps = []
 
             graph[story_id] = deps
+            dep_signatures[story_id] = tuple(sorted(deps))
 
             for dep in deps:
-                reverse_graph[dep].append(story_id)
+                reverse_graph.setdefault(dep, []).append(story_id)
 
-        return graph, dict(reverse_graph)
+        return graph, reverse_graph, dep_signatures
 
     def _extract_story_metadata(self, stories: List[Dict]) -> Dict[str, Dict]:
         """Extract metadata for each story"""
@@ -246,8 +306,7 @@ class PRDPlanner:
         if not dist:
             return [], 0
 
-        end_node = max(dist, key=dist.get)
-        max_length = dist[end_node]
+        end_node, max_length = max(dist.items(), key=itemgetter(1))
 
         # Reconstruct path
         path = []
@@ -317,15 +376,14 @@ class PRDPlanner:
 
         return phases
 
-    def _find_parallel_groups(self, graph: Dict[str, List[str]]) -> List[List[str]]:
+    def _find_parallel_groups(self, dep_signatures: Dict[str, Tuple[str, ...]]) -> List[List[str]]:
         """
         Find groups of stories that can run in parallel.
         Stories with the same set of dependencies can run together.
         """
         dep_groups: Dict[Tuple[str, ...], List[str]] = defaultdict(list)
 
-        for story_id, deps in graph.items():
-            dep_key = tuple(sorted(deps))
+        for story_id, dep_key in dep_signatures.items():
             dep_groups[dep_key].append(story_id)
 
         # Return only groups with more than one story
@@ -402,16 +460,17 @@ class PRDPlanner:
                 f"EFFICIENT: Only {len(phases)} phases for {len(stories)} stories - good parallelization potential."
             )
 
-        # 7. Quick wins - low complexity, no dependents
-        quick_wins = []
-        for story_id, meta in story_meta.items():
-            deps = reverse_graph.get(story_id, [])
-            if meta.get("complexity", 2) == 1 and len(deps) == 0:
-                quick_wins.append(story_id)
+        # 7. Quick wins - low complexity, no dependents (stop after the first 3)
+        get_dependents = reverse_graph.get
+        quick_wins = list(islice(
+            (story_id for story_id, meta in story_meta.items()
+             if meta.get("complexity", 2) == 1 and not get_dependents(story_id)),
+            3
+        ))
 
         if quick_wins:
             recommendations.append(
-                f"QUICK WINS: {', '.join(quick_wins[:3])} are low complexity with no dependents - "
+                f"QUICK WINS: {', '.join(quick_wins)} are low complexity with no dependents - "
                 f"good candidates for early completion"
             )
 
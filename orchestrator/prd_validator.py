@@ -2,34 +2,135 @@
 PRD Validator - Validates PRD JSON structure and content before acceptance
 """
 import json
-from typing import Dict, List, Any, Optional, Set
-from dataclasses import dataclass, asdict
+import hashlib
+import importlib
+import threading
+from collections import deque, OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set, Tuple, Callable, FrozenSet, NamedTuple, Union, Sequence, Iterator, IO
+from dataclasses import dataclass
 
+try:
+    # Optional C-accelerated parser; orjson.JSONDecodeError subclasses json.JSONDecodeError
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
-@dataclass
-class ValidationError:
+try:
+    # Optional incremental parser for validate_stream()
+    import ijson
+except ImportError:
+    ijson = None
+
+
+@lru_cache(maxsize=128)
+def _parse_prd(prd_json: str) -> Any:
+    """Parse PRD JSON once per distinct string; the result is shared, treat it as read-only"""
+    return _loads(prd_json)
+
+
+def _build_value(events: Iterator[Tuple[str, str, Any]], event: str, value: Any) -> Any:
+    """Build the JSON value starting at (event, value) from an ijson event stream"""
+    if event not in ("start_map", "start_array"):
+        return value
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1
+    for _, event, value in events:
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                break
+    return builder.value
+
+
+# Severities shared by every ValidationError
+SEVERITY_ERROR = "error"
+SEVERITY_WARNING = "warning"
+
+# Path templates for per-story errors
+_STORY_PATH_FMT = "$.userStories[{}]"
+_STORY_DEPENDENCIES_PATH_FMT = "$.userStories[id={}].dependencies"
+
+
+def _story_path(index: int, suffix: str = "") -> str:
+    """Format a story error path - only called when an error is actually emitted"""
+    return _STORY_PATH_FMT.format(index) + suffix
+
+
+# Generated (check_schema, check_story) pairs keyed by the valid repo set they bake in
+_VALIDATOR_CACHE: Dict[FrozenSet[str], Tuple[Callable, Callable]] = {}
+
+# Recent validation results keyed by (prd_json, valid_repos); validation is deterministic
+_VALIDATED: "OrderedDict[Tuple[str, FrozenSet[str]], ValidationResult]" = OrderedDict()
+_VALIDATED_MAX_SIZE = 256
+_validated_lock = threading.Lock()
+
+
+class _LazyMsg:
+    """Message formatted only when it is actually rendered"""
+    __slots__ = ("fmt", "args")
+
+    def __init__(self, fmt: str, *args: Any):
+        self.fmt = fmt
+        self.args = args
+
+    def __str__(self) -> str:
+        return self.fmt.format(*self.args)
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+
+class ValidationError(NamedTuple):
     """Represents a validation error or warning"""
     path: str  # JSONPath to error location
     code: str  # Error code
-    message: str  # Human-readable message
-    severity: str  # error, warning
+    message: Union[str, _LazyMsg]  # Human-readable message (render with str())
+    severity: str  # SEVERITY_ERROR or SEVERITY_WARNING
 
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "path": self.path,
+            "code": self.code,
+            "message": str(self.message),
+            "severity": self.severity
+        }
 
-@dataclass
+
+@dataclass(slots=True)
 class ValidationResult:
     """Result of PRD validation"""
     is_valid: bool
-    errors: List[ValidationError]
-    warnings: List[ValidationError]
+    errors: Sequence[ValidationError]  # empty tuple for a clean PRD
+    warnings: Sequence[ValidationError]
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "is_valid": self.is_valid,
-            "errors": [asdict(e) for e in self.errors],
-            "warnings": [asdict(w) for w in self.warnings]
+            "errors": [e.to_dict() for e in self.errors],
+            "warnings": [w.to_dict() for w in self.warnings]
         }
 
 
+# Globals the generated check functions use from this module
+RUNTIME_NAMES = ("ValidationError", "SEVERITY_ERROR", "_story_path", "_LazyMsg")
+
+
+def _runtime_namespace() -> Dict[str, Any]:
+    """Namespace the generated check functions are executed in"""
+    return {name: globals()[name] for name in RUNTIME_NAMES}
+
+
+# Bump whenever generate_source() changes the code it emits, so prebuilt
+# modules from an older generator are ignored
+GENERATOR_VERSION = 2
+
+
 class PRDValidator:
     """
     Validates PRD JSON structure and content.
@@ -44,6 +145,17 @@ class PRDValidator:
     # Optional but recommended top-level fields
     RECOMMENDED_TOP_LEVEL_FIELDS = ["project", "feature", "branchName", "repos"]
 
+    # Prebuilt (field, warning) pairs; ValidationError is immutable so instances are shared
+    _RECOMMENDED_FIELD_CHECKS = [
+        (field, ValidationError(
+            path=f"$.{field}",
+            code="MISSING_RECOMMENDED_FIELD",
+            message=f"Recommended field '{field}' is missing",
+            severity=SEVERITY_WARNING
+        ))
+        for field in RECOMMENDED_TOP_LEVEL_FIELDS
+    ]
+
     # Required fields for each story
     STORY_REQUIRED_FIELDS = {
         "id": str,
@@ -57,7 +169,159 @@ class PRDValidator:
     STORY_OPTIONAL_FIELDS = ["priority", "status", "dependencies"]
 
     # Valid repo/codebase types (can be extended)
-    DEFAULT_VALID_REPOS = ["backend", "mobile", "frontend", "api", "web", "ios", "android"]
+    DEFAULT_VALID_REPOS = frozenset({"backend", "mobile", "frontend", "api", "web", "ios", "android"})
+
+    @classmethod
+    def _compile(cls, valid_repos: FrozenSet[str]) -> Tuple[Callable, Callable]:
+        """
+        Get specialized check functions for a set of valid repos.
+
+        Every required-field check is inlined into straight-line Python
+        source, and the valid repos are baked in as a set, so validation
+        doesn't re-walk the tables or scan the repo list per story. The
+        generated functions are cached per repo set at module level; the
+        default repo set is served from the prebuilt module when it is
+        up to date.
+        """
+        compiled = _VALIDATOR_CACHE.get(valid_repos)
+        if compiled is None:
+            compiled = cls._load_prebuilt(valid_repos) or cls._generate(valid_repos)
+            compiled = _VALIDATOR_CACHE.setdefault(valid_repos, compiled)
+        return compiled
+
+    @classmethod
+    def _load_prebuilt(cls, valid_repos: FrozenSet[str]) -> Optional[Tuple[Callable, Callable]]:
+        """
+        Load check functions from _prd_schema_validator (written by
+        scripts/build_prd_validator.py), skipping compile() at runtime.
+
+        Returns None if the module is missing, was built for another repo
+        set, or is stale relative to the current field tables.
+        """
+        if valid_repos != cls.DEFAULT_VALID_REPOS:
+            return None
+        try:
+            module_name = f"{__package__}._prd_schema_validator" if __package__ else "_prd_schema_validator"
+            prebuilt = importlib.import_module(module_name)
+        except ImportError:
+            return None
+        if getattr(prebuilt, "INPUTS_FINGERPRINT", None) != cls.inputs_fingerprint(valid_repos):
+            return None
+        return prebuilt.check_schema, prebuilt.check_story
+
+    @classmethod
+    def inputs_fingerprint(cls, valid_repos: FrozenSet[str]) -> str:
+        """
+        Fingerprint of everything generate_source() output depends on.
+
+        Stored in the prebuilt module, so checking it for staleness only
+        hashes the field tables instead of regenerating the source.
+        """
+        inputs = repr((
+            GENERATOR_VERSION,
+            sorted(valid_repos),
+            [(field, t.__name__) for field, t in cls.REQUIRED_TOP_LEVEL_FIELDS.items()],
+            [(field, t.__name__) for field, t in cls.STORY_REQUIRED_FIELDS.items()],
+        ))
+        return hashlib.blake2b(inputs.encode(), digest_size=16).hexdigest()
+
+    @classmethod
+    def _generate(cls, valid_repos: FrozenSet[str]) -> Tuple[Callable, Callable]:
+        """Compile the generated check_schema/check_story source"""
+        namespace = _runtime_namespace()
+        exec(compile(cls.generate_source(valid_repos), "<prd_validator>", "exec"), namespace)
+        return namespace["check_schema"], namespace["check_story"]
+
+    @classmethod
+    def generate_source(cls, valid_repos: FrozenSet[str]) -> str:
+        """
+        Generate check_schema/check_story module source for a repo set.
+
+        The source defines its own constants; ValidationError, _LazyMsg,
+        _story_path and SEVERITY_ERROR (RUNTIME_NAMES) must be provided by
+        the namespace it runs in, or imported by the module it is written to.
+        """
+        constants = [
+            "_MISSING = object()",
+            f"_valid_repos = frozenset({sorted(valid_repos)!r})",
+            f"_valid_repos_sorted = {sorted(valid_repos)!r}",
+        ]
+        lines = []
+
+        def emit_field_checks(
+            obj: str,
+            root: Optional[str],
+            tables: Dict[str, type],
+            missing_fmt: str,
+            type_fmt: str
+        ) -> Dict[str, str]:
+            """Emit checks that read each field into a local once; returns field -> local name"""
+            # root is a constant path prefix; None means a story path built from `index` on emit
+            field_vars = {}
+            for n, (field, expected_type) in enumerate(tables.items()):
+                type_name = f"_{obj}_type_{n}"
+                value_var = f"{obj}_{n}"
+                # Tables only use builtin types, so the name round-trips through source
+                constants.append(f"{type_name} = {expected_type.__name__}")
+                field_vars[field] = value_var
+                if root is None:
+                    field_path = f"_story_path(index, {f'.{field}'!r})"
+                else:
+                    field_path = repr(f"{root}.{field}")
+                lines.extend([
+                    f"    {value_var} = {obj}.get({field!r}, _MISSING)",
+                    f"    if {value_var} is _MISSING:",
+                    f"        errors.append(ValidationError(path={field_path}, code='MISSING_FIELD', "
+                    f"message={missing_fmt.format(field=field)!r}, severity=SEVERITY_ERROR))",
+                    f"    elif not isinstance({value_var}, {type_name}):",
+                    f"        errors.append(ValidationError(path={field_path}, code='INVALID_TYPE', "
+                    f"message={type_fmt.format(field=field, type=expected_type.__name__)!r}, severity=SEVERITY_ERROR))",
+                ])
+            return field_vars
+
+        def value_of(field_vars: Dict[str, str], obj: str, field: str) -> str:
+            """Expression for obj.get(field), reusing the local read by the field checks"""
+            value_var = field_vars.get(field)
+            if value_var is None:
+                return f"{obj}.get({field!r})"
+            return f"(None if {value_var} is _MISSING else {value_var})"
+
+        lines.append("def check_schema(prd):")
+        lines.append("    errors = []")
+        emit_field_checks(
+            "prd", "$", cls.REQUIRED_TOP_LEVEL_FIELDS,
+            "Required field '{field}' is missing",
+            "Field '{field}' must be of type {type}"
+        )
+        lines.append("    return errors")
+
+        lines.extend([
+            "",
+            "",
+            "def check_story(story, index, existing_ids, errors):",
+            "    if not isinstance(story, dict):",
+            "        errors.append(ValidationError(path=_story_path(index), code='INVALID_STORY_TYPE', "
+            "message='Story must be an object', severity=SEVERITY_ERROR))",
+            "        return",
+        ])
+        story_vars = emit_field_checks(
+            "story", None, cls.STORY_REQUIRED_FIELDS,
+            "Story missing required field '{field}'",
+            "Story field '{field}' must be of type {type}"
+        )
+        lines.extend([
+            f"    story_id = {value_of(story_vars, 'story', 'id')}",
+            "    if story_id and story_id in existing_ids:",
+            "        errors.append(ValidationError(path=_story_path(index, '.id'), code='DUPLICATE_STORY_ID', "
+            "message=_LazyMsg(\"Duplicate story ID: '{}'\", story_id), severity=SEVERITY_ERROR))",
+            f"    repo = {value_of(story_vars, 'story', 'repo')}",
+            "    if repo and (not isinstance(repo, str) or repo not in _valid_repos):",
+            "        errors.append(ValidationError(path=_story_path(index, '.repo'), code='INVALID_CODEBASE', "
+            "message=_LazyMsg(\"Repository '{}' not found in valid codebases. Valid options: {}\", "
+            "repo, _valid_repos_sorted), "
+            "severity=SEVERITY_ERROR))",
+        ])
+        return "\n".join(constants + ["", ""] + lines) + "\n"
 
     def validate(
         self,
@@ -72,15 +336,169 @@ class PRDValidator:
             project_codebases: List of valid codebase names for the project.
                                If None, uses DEFAULT_VALID_REPOS.
 
+        Returns:
+            ValidationResult with errors and warnings. Results for recently
+            validated PRDs are returned from cache and shared between
+            callers, so treat them as read-only.
+        """
+        # Use project codebases or defaults
+        valid_repos = frozenset(project_codebases) if project_codebases else self.DEFAULT_VALID_REPOS
+
+        key = (prd_json, valid_repos)
+        with _validated_lock:
+            cached = _VALIDATED.get(key)
+            if cached is not None:
+                _VALIDATED.move_to_end(key)
+                return cached
+
+        result = self._validate(prd_json, valid_repos)
+
+        with _validated_lock:
+            _VALIDATED[key] = result
+            while len(_VALIDATED) > _VALIDATED_MAX_SIZE:
+                _VALIDATED.popitem(last=False)
+
+        return result
+
+    def validate_stream(
+        self,
+        prd_file: Union[IO, str, bytes],
+        project_codebases: Optional[List[str]] = None
+    ) -> ValidationResult:
+        """
+        Validate a PRD from a file object without loading it whole.
+
+        Stories are parsed and validated one at a time as ijson yields
+        them; only (id, dependencies) pairs are kept for the dependency
+        checks. Falls back to validate() for in-memory strings or when
+        ijson is not installed.
+
+        Args:
+            prd_file: Binary file object with the PRD JSON (or the JSON itself)
+            project_codebases: List of valid codebase names for the project.
+                               If None, uses DEFAULT_VALID_REPOS.
+
         Returns:
             ValidationResult with errors and warnings
         """
+        if ijson is None or isinstance(prd_file, (str, bytes)):
+            prd_json = prd_file if isinstance(prd_file, (str, bytes)) else prd_file.read()
+            if isinstance(prd_json, bytes):
+                prd_json = prd_json.decode()
+            return self.validate(prd_json, project_codebases)
+
+        valid_repos = frozenset(project_codebases) if project_codebases else self.DEFAULT_VALID_REPOS
+        check_schema, check_story = self._compile(valid_repos)
+
+        errors: List[ValidationError] = []
+        warnings: List[ValidationError] = []
+
+        # Top-level fields other than userStories are small and built whole;
+        # userStories is replaced by a placeholder list once streamed
+        prd: Dict[str, Any] = {}
+        story_errors: List[ValidationError] = []
+        story_warnings: List[ValidationError] = []
+        dep_stories: List[Dict[str, Any]] = []
+        story_count = 0
+
+        try:
+            events = ijson.parse(prd_file, use_float=True)
+            _, event, _ = next(events, ("", None, None))
+            if event is None:
+                raise ijson.JSONError("empty document")
+            if event != "start_map":
+                return ValidationResult(
+                    is_valid=False,
+                    errors=[ValidationError(
+                        path="$",
+                        code="INVALID_FORMAT",
+                        message="PRD must be a JSON object",
+                        severity=SEVERITY_ERROR
+                    )],
+                    warnings=[]
+                )
+
+            story_ids: Set[str] = set()
+            validate_story = self._validate_story
+            for _, event, key in events:
+                if event == "end_map":
+                    break
+                _, event, value = next(events)
+                if key != "userStories" or event != "start_array":
+                    prd[key] = _build_value(events, event, value)
+                    continue
+
+                prd[key] = []
+                for _, event, value in events:
+                    if event == "end_array":
+                        break
+                    story = _build_value(events, event, value)
+                    validate_story(story, story_count, check_story, story_ids, story_errors, story_warnings)
+                    story_count += 1
+                    if isinstance(story, dict):
+                        story_id = story.get("id")
+                        if story_id:
+                            story_ids.add(story_id)
+                        # Keep only what the dependency checks need
+                        dep_stories.append({"id": story_id, "dependencies": story.get("dependencies", [])})
+
+            # Reject trailing content, as json.loads would
+            for _ in events:
+                pass
+        except ijson.JSONError as e:
+            return ValidationResult(
+                is_valid=False,
+                errors=[ValidationError(
+                    path="$",
+                    code="INVALID_JSON",
+                    message=f"Invalid JSON: {str(e)}",
+                    severity=SEVERITY_ERROR
+                )],
+                warnings=[]
+            )
+
+        # Validate top-level structure
+        errors.extend(check_schema(prd))
+        warnings.extend(self._check_recommended_fields(prd))
+
+        # Story results only count once the structure is known to be valid
+        if errors:
+            return ValidationResult(is_valid=False, errors=errors, warnings=warnings)
+
+        if story_count == 0:
+            errors.append(ValidationError(
+                path="$.userStories",
+                code="EMPTY_STORIES",
+                message="PRD must contain at least one user story",
+                severity=SEVERITY_ERROR
+            ))
+            return ValidationResult(is_valid=False, errors=errors, warnings=warnings)
+
+        errors.extend(story_errors)
+        warnings.extend(story_warnings)
+
+        # Validate dependencies
+        dep_errors, dep_warnings = self._validate_dependencies(dep_stories)
+        errors.extend(dep_errors)
+        warnings.extend(dep_warnings)
+
+        if not errors and not warnings:
+            return ValidationResult(is_valid=True, errors=(), warnings=())
+
+        return ValidationResult(
+            is_valid=len(errors) == 0,
+            errors=errors,
+            warnings=warnings
+        )
+
+    def _validate(self, prd_json: str, valid_repos: FrozenSet[str]) -> ValidationResult:
+        """Run the full validation for one PRD and repo set"""
         errors: List[ValidationError] = []
         warnings: List[ValidationError] = []
 
         # Parse JSON
         try:
-            prd = json.loads(prd_json)
+            prd = _parse_prd(prd_json)
         except json.JSONDecodeError as e:
             return ValidationResult(
                 is_valid=False,
@@ -88,7 +506,7 @@ class PRDValidator:
                     path="$",
                     code="INVALID_JSON",
                     message=f"Invalid JSON: {str(e)}",
-                    severity="error"
+                    severity=SEVERITY_ERROR
                 )],
                 warnings=[]
             )
@@ -100,16 +518,15 @@ class PRDValidator:
                     path="$",
                     code="INVALID_FORMAT",
                     message="PRD must be a JSON object",
-                    severity="error"
+                    severity=SEVERITY_ERROR
                 )],
                 warnings=[]
             )
 
-        # Use project codebases or defaults
-        valid_repos = project_codebases or self.DEFAULT_VALID_REPOS
+        check_schema, check_story = self._compile(valid_repos)
 
         # Validate top-level structure
-        schema_errors = self._validate_schema(prd)
+        schema_errors = check_schema(prd)
         errors.extend(schema_errors)
 
         # Check for recommended fields
@@ -128,154 +545,97 @@ class PRDValidator:
                 path="$.userStories",
                 code="EMPTY_STORIES",
                 message="PRD must contain at least one user story",
-                severity="error"
+                severity=SEVERITY_ERROR
             ))
             return ValidationResult(is_valid=False, errors=errors, warnings=warnings)
 
         # Track story IDs for uniqueness check
         story_ids: Set[str] = set()
+        validate_story = self._validate_story
+        add_story_id = story_ids.add
 
         for i, story in enumerate(stories):
-            # Validate story structure
-            story_errors, story_warnings = self._validate_story(story, i, valid_repos, story_ids)
-            errors.extend(story_errors)
-            warnings.extend(story_warnings)
+            # Validate story structure, appending straight into errors/warnings
+            validate_story(story, i, check_story, story_ids, errors, warnings)
 
-            # Add to seen IDs
-            story_id = story.get("id")
-            if story_id:
-                story_ids.add(story_id)
+            # Add to seen IDs (non-object stories were reported above)
+            if isinstance(story, dict):
+                story_id = story.get("id")
+                if story_id:
+                    add_story_id(story_id)
 
         # Validate dependencies
-        dep_errors, dep_warnings = self._validate_dependencies(stories)
+        dep_errors, dep_warnings = self._validate_dependencies(
+            [story for story in stories if isinstance(story, dict)]
+        )
         errors.extend(dep_errors)
         warnings.extend(dep_warnings)
 
+        if not errors and not warnings:
+            # Clean PRD: share immutable empty tuples instead of keeping empty lists
+            return ValidationResult(is_valid=True, errors=(), warnings=())
+
         return ValidationResult(
             is_valid=len(errors) == 0,
             errors=errors,
             warnings=warnings
         )
 
-    def _validate_schema(self, prd: Dict[str, Any]) -> List[ValidationError]:
-        """Validate required top-level fields"""
-        errors = []
-
-        for field, expected_type in self.REQUIRED_TOP_LEVEL_FIELDS.items():
-            if field not in prd:
-                errors.append(ValidationError(
-                    path=f"$.{field}",
-                    code="MISSING_FIELD",
-                    message=f"Required field '{field}' is missing",
-                    severity="error"
-                ))
-            elif not isinstance(prd[field], expected_type):
-                errors.append(ValidationError(
-                    path=f"$.{field}",
-                    code="INVALID_TYPE",
-                    message=f"Field '{field}' must be of type {expected_type.__name__}",
-                    severity="error"
-                ))
-
-        return errors
-
     def _check_recommended_fields(self, prd: Dict[str, Any]) -> List[ValidationError]:
         """Check for recommended but optional fields"""
-        warnings = []
-
-        for field in self.RECOMMENDED_TOP_LEVEL_FIELDS:
-            if field not in prd:
-                warnings.append(ValidationError(
-                    path=f"$.{field}",
-                    code="MISSING_RECOMMENDED_FIELD",
-                    message=f"Recommended field '{field}' is missing",
-                    severity="warning"
-                ))
-
-        return warnings
+        return [warning for field, warning in self._RECOMMENDED_FIELD_CHECKS if field not in prd]
 
     def _validate_story(
         self,
         story: Dict[str, Any],
         index: int,
-        valid_repos: List[str],
-        existing_ids: Set[str]
-    ) -> tuple:
-        """Validate a single story"""
-        errors = []
-        warnings = []
-        path = f"$.userStories[{index}]"
+        check_story: Callable,
+        existing_ids: Set[str],
+        errors: List[ValidationError],
+        warnings: List[ValidationError]
+    ) -> None:
+        """Validate a single story, appending to the shared errors/warnings lists"""
 
         if not isinstance(story, dict):
             errors.append(ValidationError(
-                path=path,
+                path=_story_path(index),
                 code="INVALID_STORY_TYPE",
                 message="Story must be an object",
-                severity="error"
-            ))
-            return errors, warnings
-
-        # Check required fields
-        for field, expected_type in self.STORY_REQUIRED_FIELDS.items():
-            if field not in story:
-                errors.append(ValidationError(
-                    path=f"{path}.{field}",
-                    code="MISSING_FIELD",
-                    message=f"Story missing required field '{field}'",
-                    severity="error"
-                ))
-            elif not isinstance(story[field], expected_type):
-                errors.append(ValidationError(
-                    path=f"{path}.{field}",
-                    code="INVALID_TYPE",
-                    message=f"Story field '{field}' must be of type {expected_type.__name__}",
-                    severity="error"
-                ))
-
-        # Check story ID uniqueness
-        story_id = story.get("id")
-        if story_id and story_id in existing_ids:
-            errors.append(ValidationError(
-                path=f"{path}.id",
-                code="DUPLICATE_STORY_ID",
-                message=f"Duplicate story ID: '{story_id}'",
-                severity="error"
+                severity=SEVERITY_ERROR
             ))
+            return
 
-        # Validate repo/codebase reference
-        repo = story.get("repo")
-        if repo and repo not in valid_repos:
-            errors.append(ValidationError(
-                path=f"{path}.repo",
-                code="INVALID_CODEBASE",
-                message=f"Repository '{repo}' not found in valid codebases. Valid options: {valid_repos}",
-                severity="error"
-            ))
+        # Check required fields, story ID uniqueness and repo/codebase reference
+        check_story(story, index, existing_ids, errors)
 
         # Validate acceptance criteria
         criteria = story.get("acceptanceCriteria", [])
         if isinstance(criteria, list):
             if len(criteria) == 0:
                 warnings.append(ValidationError(
-                    path=f"{path}.acceptanceCriteria",
+                    path=_story_path(index, ".acceptanceCriteria"),
                     code="EMPTY_ACCEPTANCE_CRITERIA",
                     message="Story has no acceptance criteria",
-                    severity="warning"
+                    severity=SEVERITY_WARNING
                 ))
             for j, criterion in enumerate(criteria):
                 if not isinstance(criterion, str):
                     errors.append(ValidationError(
-                        path=f"{path}.acceptanceCriteria[{j}]",
+                        path=_story_path(index, f".acceptanceCriteria[{j}]"),
                         code="INVALID_CRITERION_TYPE",
                         message="Acceptance criterion must be a string",
-                        severity="error"
+                        severity=SEVERITY_ERROR
                     ))
-                elif len(criterion.strip()) < 10:
+                elif len(criterion) < 10 or (
+                    # Only pay for strip() when there is edge whitespace to remove
+                    (criterion[0].isspace() or criterion[-1].isspace())
+                    and len(criterion.strip()) < 10
+                ):
                     warnings.append(ValidationError(
-                        path=f"{path}.acceptanceCriteria[{j}]",
+                        path=_story_path(index, f".acceptanceCriteria[{j}]"),
                         code="SHORT_CRITERION",
                         message="Acceptance criterion is very short, consider adding more detail",
-                        severity="warning"
+                        severity=SEVERITY_WARNING
                     ))
 
         # Validate priority if present
@@ -283,160 +643,238 @@ class PRDValidator:
         if priority is not None:
             if not isinstance(priority, int):
                 errors.append(ValidationError(
-                    path=f"{path}.priority",
+                    path=_story_path(index, ".priority"),
                     code="INVALID_PRIORITY_TYPE",
                     message="Priority must be an integer",
-                    severity="error"
+                    severity=SEVERITY_ERROR
                 ))
             elif priority < 1 or priority > 10:
                 warnings.append(ValidationError(
-                    path=f"{path}.priority",
+                    path=_story_path(index, ".priority"),
                     code="PRIORITY_OUT_OF_RANGE",
                     message="Priority should be between 1 and 10",
-                    severity="warning"
+                    severity=SEVERITY_WARNING
                 ))
 
         # Validate dependencies if present
         deps = story.get("dependencies", [])
         if deps and not isinstance(deps, list):
             errors.append(ValidationError(
-                path=f"{path}.dependencies",
+                path=_story_path(index, ".dependencies"),
                 code="INVALID_DEPENDENCIES_TYPE",
                 message="Dependencies must be an array",
-                severity="error"
+                severity=SEVERITY_ERROR
             ))
 
         # Check title length
         title = story.get("title", "")
         if isinstance(title, str) and len(title) < 10:
             warnings.append(ValidationError(
-                path=f"{path}.title",
+                path=_story_path(index, ".title"),
                 code="SHORT_TITLE",
                 message="Story title is very short, consider being more descriptive",
-                severity="warning"
+                severity=SEVERITY_WARNING
             ))
 
         # Check description length
         description = story.get("description", "")
         if isinstance(description, str) and len(description) < 30:
             warnings.append(ValidationError(
-                path=f"{path}.description",
+                path=_story_path(index, ".description"),
                 code="SHORT_DESCRIPTION",
                 message="Story description is very short, consider adding more context",
-                severity="warning"
+                severity=SEVERITY_WARNING
             ))
 
-        return errors, warnings
-
     def _validate_dependencies(self, stories: List[Dict[str, Any]]) -> tuple:
         """Validate dependency graph for missing refs and circular deps"""
         errors = []
         warnings = []
 
-        # Build set of all story IDs
-        story_ids = {s.get("id") for s in stories if s.get("id")}
-
-        # Build dependency graph
+        # Single walk: collect story IDs, build the dependency graph and
+        # remember each story's dependencies for the missing-ref check
+        story_ids: Set[str] = set()
         graph: Dict[str, List[str]] = {}
-        for story in stories:
-            story_id = story.get("id")
-            if story_id:
-                deps = story.get("dependencies", [])
-                graph[story_id] = deps if isinstance(deps, list) else []
+        story_deps: List[Tuple[Any, List[str]]] = []
 
-        # Check for missing dependencies
         for story in stories:
             story_id = story.get("id")
             deps = story.get("dependencies", [])
-
             if not isinstance(deps, list):
-                continue
+                deps = []
 
+            if story_id:
+                story_ids.add(story_id)
+                graph[story_id] = deps
+            if deps:
+                story_deps.append((story_id, deps))
+
+        # Check for missing dependencies (needs the complete ID set)
+        for story_id, deps in story_deps:
             for dep_id in deps:
                 if dep_id not in story_ids:
                     errors.append(ValidationError(
-                        path=f"$.userStories[id={story_id}].dependencies",
+                        path=_STORY_DEPENDENCIES_PATH_FMT.format(story_id),
                         code="MISSING_DEPENDENCY",
-                        message=f"Story '{story_id}' depends on '{dep_id}' which does not exist",
-                        severity="error"
+                        message=_LazyMsg("Story '{}' depends on '{}' which does not exist", story_id, dep_id),
+                        severity=SEVERITY_ERROR
                     ))
 
         # Check for circular dependencies
-        cycles = self._find_circular_dependencies(graph)
+        sccs = self._tarjan_scc(graph)
+        cycles = self._find_circular_dependencies(graph, sccs)
         for cycle in cycles:
             errors.append(ValidationError(
                 path="$.userStories.dependencies",
                 code="CIRCULAR_DEPENDENCY",
                 message=f"Circular dependency detected: {' -> '.join(cycle)}",
-                severity="error"
+                severity=SEVERITY_ERROR
             ))
 
         # Warn about deep dependency chains
-        max_depth = self._calculate_max_depth(graph)
+        max_depth = self._calculate_max_depth(graph, sccs)
         if max_depth > 5:
             warnings.append(ValidationError(
                 path="$.userStories.dependencies",
                 code="DEEP_DEPENDENCY_CHAIN",
-                message=f"Dependency chain depth is {max_depth}. Consider flattening dependencies.",
-                severity="warning"
+                message=_LazyMsg("Dependency chain depth is {}. Consider flattening dependencies.", max_depth),
+                severity=SEVERITY_WARNING
             ))
 
         return errors, warnings
 
-    def _find_circular_dependencies(self, graph: Dict[str, List[str]]) -> List[List[str]]:
-        """Detect circular dependencies using DFS"""
-        cycles = []
-        visited: Set[str] = set()
-        rec_stack: Set[str] = set()
+    def _find_circular_dependencies(
+        self,
+        graph: Dict[str, List[str]],
+        sccs: Optional[List[List[str]]] = None
+    ) -> List[List[str]]:
+        """
+        Detect circular dependencies.
 
-        def dfs(node: str, path: List[str]) -> None:
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
+        Every strongly connected component with more than one story, or a
+        story depending on itself, is reported as one cycle.
+        """
+        if sccs is None:
+            sccs = self._tarjan_scc(graph)
 
-            for neighbor in graph.get(node, []):
-                if neighbor not in visited:
-                    dfs(neighbor, path)
-                elif neighbor in rec_stack:
-                    # Found cycle
-                    cycle_start = path.index(neighbor) if neighbor in path else -1
-                    if cycle_start >= 0:
-                        cycle = path[cycle_start:] + [neighbor]
-                        cycles.append(cycle)
-
-            path.pop()
-            rec_stack.remove(node)
-
-        for node in graph:
-            if node not in visited:
-                dfs(node, [])
+        cycles = []
+
+        for scc in sccs:
+            root = scc[0]
+            if len(scc) > 1 or root in graph.get(root, []):
+                cycles.append(self._cycle_path(graph, scc))
 
         return cycles
 
-    def _calculate_max_depth(self, graph: Dict[str, List[str]]) -> int:
-        """Calculate maximum dependency chain depth"""
-        memo: Dict[str, int] = {}
+    def _tarjan_scc(self, graph: Dict[str, List[str]]) -> List[List[str]]:
+        """
+        Iterative Tarjan strongly connected components, O(V+E).
 
-        def depth(node: str, visited: Set[str]) -> int:
-            if node in memo:
-                return memo[node]
-            if node in visited:
-                return 0  # Cycle detected, handled elsewhere
-            if node not in graph or not graph[node]:
-                return 0
+        Components are returned dependencies-first (reverse topological
+        order of the dependency graph), each starting from its root node.
+        """
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        sccs: List[List[str]] = []
+
+        for start in graph:
+            if start in index:
+                continue
 
-            visited.add(node)
-            max_dep_depth = 0
-            for dep in graph[node]:
-                max_dep_depth = max(max_dep_depth, depth(dep, visited))
-            visited.remove(node)
+            index[start] = lowlink[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            work_stack = [(start, iter(graph.get(start, [])))]
+
+            while work_stack:
+                node, neighbors = work_stack[-1]
+                for neighbor in neighbors:
+                    if neighbor not in index:
+                        index[neighbor] = lowlink[neighbor] = len(index)
+                        stack.append(neighbor)
+                        on_stack.add(neighbor)
+                        work_stack.append((neighbor, iter(graph.get(neighbor, []))))
+                        break
+                    if neighbor in on_stack and index[neighbor] < lowlink[node]:
+                        lowlink[node] = index[neighbor]
+                else:
+                    # All neighbors done - propagate lowlink and pop component
+                    work_stack.pop()
+                    if work_stack:
+                        parent = work_stack[-1][0]
+                        if lowlink[node] < lowlink[parent]:
+                            lowlink[parent] = lowlink[node]
+
+                    if lowlink[node] == index[node]:
+                        scc = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            scc.append(member)
+                            if member == node:
+                                break
+                        scc.reverse()
+                        sccs.append(scc)
+
+        return sccs
+
+    def _cycle_path(self, graph: Dict[str, List[str]], scc: List[str]) -> List[str]:
+        """Find a shortest cycle through the root of a strongly connected component"""
+        start = scc[0]
+        members = set(scc)
+        previous: Dict[str, str] = {}
+        queue = deque([start])
+
+        while queue:
+            node = queue.popleft()
+            for neighbor in graph.get(node, []):
+                if neighbor == start:
+                    path = [node]
+                    while node != start:
+                        node = previous[node]
+                        path.append(node)
+                    path.reverse()
+                    path.append(start)
+                    return path
+                if neighbor in members and neighbor not in previous:
+                    previous[neighbor] = node
+                    queue.append(neighbor)
+
+        return scc + [start]
+
+    def _calculate_max_depth(
+        self,
+        graph: Dict[str, List[str]],
+        sccs: Optional[List[List[str]]] = None
+    ) -> int:
+        """
+        Calculate maximum dependency chain depth.
 
-            memo[node] = max_dep_depth + 1
-            return memo[node]
+        Walks the Tarjan components dependencies-first, so every dependency's
+        depth is known before its dependents - one linear sweep, no recursion.
+        Edges inside a cycle count as depth 0 (cycles are reported elsewhere).
+        """
+        if sccs is None:
+            sccs = self._tarjan_scc(graph)
 
+        memo: Dict[str, int] = {}
         max_depth = 0
-        for node in graph:
-            max_depth = max(max_depth, depth(node, set()))
+
+        for scc in sccs:
+            # A lone node's only in-component edge is a self-loop
+            members = scc if len(scc) == 1 else set(scc)
+            for node in scc:
+                deps = graph.get(node)
+                if not deps:
+                    memo[node] = 0
+                    continue
+
+                node_depth = 1 + max(0 if dep in members else memo.get(dep, 0) for dep in deps)
+                memo[node] = node_depth
+                if node_depth > max_depth:
+                    max_depth = node_depth
 
         return max_depth
 
@@ -3,7 +3,7 @@ Pydantic schemas for API requests and responses
 """
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 # ============================================================================
@@ -212,7 +212,7 @@ class StoryResponse(BaseModel):
     codebase_id: Optional[int]
     title: str
     description: Optional[str]
-    acceptance_criteria: Optional[str]  # JSON string
+    acceptance_criteria: Optional[List[Any]]
     priority: int
     status: str
     dependencies: Optional[str]  # JSON string
@@ -225,6 +225,14 @@ class StoryResponse(BaseModel):
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
 
+    @field_validator("acceptance_criteria", mode="before")
+    @classmethod
+    def _criteria_as_list(cls, value):
+        # PRDs are stored unvalidated, so a single criterion may not be a list
+        if value is None or isinstance(value, list):
+            return value
+        return [value]
+
     class Config:
         from_attributes = True
 
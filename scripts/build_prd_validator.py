@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Build Prebuilt PRD Validator Script for Ralph-Advanced
+
+Writes orchestrator/_prd_schema_validator.py, the generated PRD
+check_schema/check_story functions for the default repo set, so the
+orchestrator imports them instead of compiling them at runtime.
+
+Re-run this whenever the PRDValidator field tables or default repos
+change; a stale module is detected by fingerprint and ignored.
+
+Usage:
+    python scripts/build_prd_validator.py
+
+Or check that the checked-in module is up to date:
+    python scripts/build_prd_validator.py --check
+"""
+import sys
+import os
+import argparse
+
+# Add the orchestrator directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'orchestrator'))
+
+from prd_validator import PRDValidator, RUNTIME_NAMES
+
+OUTPUT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'orchestrator', '_prd_schema_validator.py'
+)
+
+HEADER = '''"""
+Prebuilt PRD check functions for the default repo set.
+
+Generated by scripts/build_prd_validator.py - do not edit by hand.
+"""
+try:
+    from .prd_validator import {names}
+except ImportError:
+    from prd_validator import {names}
+'''
+
+
+def build_module() -> str:
+    """
+    Render the prebuilt validator module.
+
+    Returns:
+        Module source as string
+    """
+    valid_repos = PRDValidator.DEFAULT_VALID_REPOS
+    source = PRDValidator.generate_source(valid_repos)
+    header = HEADER.format(names=", ".join(RUNTIME_NAMES))
+    fingerprint = PRDValidator.inputs_fingerprint(valid_repos)
+    return f"{header}\nINPUTS_FINGERPRINT = {fingerprint!r}\n\n{source}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the prebuilt PRD validator module')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit non-zero if the checked-in module is out of date')
+    args = parser.parse_args()
+
+    module_source = build_module()
+
+    if args.check:
+        try:
+            with open(OUTPUT_PATH, 'r') as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+        if current != module_source:
+            print(f"{OUTPUT_PATH} is out of date; run scripts/build_prd_validator.py")
+            sys.exit(1)
+        print(f"{OUTPUT_PATH} is up to date")
+        return
+
+    with open(OUTPUT_PATH, 'w') as f:
+        f.write(module_source)
+    print(f"Wrote {OUTPUT_PATH}")
+
+
+if __name__ == '__main__':
+    main()
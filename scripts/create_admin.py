@@ -16,14 +16,29 @@ import os
 import argparse
 
 # Add the orchestrator directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'orchestrator'))
 
-from database import SessionLocal, init_db
-from auth import get_password_hash
+from sqlalchemy import select, insert
+from database import engine, get_password_hash
 from models import User
 
 
+def insert_user_statement():
+    """
+    INSERT for the users table that skips existing usernames.
+
+    Uses ON CONFLICT (username) DO NOTHING where the dialect supports it,
+    so a concurrent run can't fail on the unique constraint.
+    """
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(User)
+    return dialect_insert(User).on_conflict_do_nothing(index_elements=["username"])
+
+
 def create_admin_user(username: str, password: str) -> bool:
     """
     Create an admin user in the database.
@@ -35,39 +50,40 @@ def create_admin_user(username: str, password: str) -> bool:
     Returns:
         True if user was created, False if user already exists
     """
-    # Initialize database
-    init_db()
-
-    # Create session
-    db = SessionLocal()
-
     try:
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.username == username).first()
-        if existing_user:
+        # The orchestrator creates the full schema on startup; only make sure
+        # the users table exists rather than running all DDL via init_db()
+        User.__table__.create(bind=engine, checkfirst=True)
+
+        with engine.begin() as conn:
+            # Check if user already exists (before paying for the bcrypt hash)
+            existing_user = conn.execute(
+                select(User.id).where(User.username == username)
+            ).first()
+            if existing_user:
+                print(f"User '{username}' already exists.")
+                return False
+
+            # Create new admin user
+            created = conn.execute(
+                insert_user_statement().values(
+                    username=username,
+                    password_hash=get_password_hash(password)
+                )
+            ).rowcount == 1
+
+        if not created:
             print(f"User '{username}' already exists.")
             return False
 
-        # Create new admin user
-        admin = User(
-            username=username,
-            password_hash=get_password_hash(password)
-        )
-        db.add(admin)
-        db.commit()
-
         print(f"Admin user '{username}' created successfully!")
         print(f"You can now log in at the web interface.")
         return True
 
     except Exception as e:
         print(f"Error creating admin user: {e}")
-        db.rollback()
         return False
 
-    finally:
-        db.close()
-
 
 def main():
     parser = argparse.ArgumentParser(
@@ -40,7 +40,7 @@ export interface Story {
   repo: string;
   title: string;
   description?: string;
-  acceptance_criteria?: string;
+  acceptance_criteria?: string[];
   priority: number;
   status: 'pending' | 'in_progress' | 'review' | 'testing' | 'rework' | 'done' | 'failed';
   dependencies?: string;
@@ -4,14 +4,29 @@ Supports loading prompts from database with filesystem fallback
 Supports loading API keys from database settings
 """
 import os
+import re
 import sys
 import json
+import time
+import asyncio
+import threading
+import weakref
 import httpx
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from anthropic import Anthropic
 
+try:
+    # Optional C-accelerated parser; orjson.JSONDecodeError subclasses json.JSONDecodeError
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 # API Configuration (defaults - can be overridden by database settings)
 API_PROVIDER = os.getenv("API_PROVIDER", "claude")  # manus or claude
@@ -19,9 +34,112 @@ MANUS_API_KEY = os.getenv("MANUS_API_KEY", "")
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY", "")
 MANUS_API_BASE = os.getenv("MANUS_API_BASE", "https://api.manus.im/v1")
 
+# SystemSetting keys that override the API configuration above
+API_SETTING_KEYS = ("api_provider", "claude_api_key", "manus_api_key")
+
 # Prompt file base path
 PROMPT_BASE_PATH = os.getenv("PROMPT_BASE_PATH", "/app/agents")
 
+# How long a DB prompt is served from cache before re-checking its active version
+PROMPT_CACHE_TTL = 60.0
+
+# agent_name -> (checked_at, active version, content)
+_DB_PROMPT_CACHE: Dict[str, Tuple[float, int, str]] = {}
+_db_prompt_lock = threading.Lock()
+
+# Shared Manus HTTP clients, one per event loop (httpx connection pools can't cross loops)
+_MANUS_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+# Template placeholders filled by inject_story_data, matched in a single pass
+_EACH_CRITERIA_BLOCK = "{{#each story.acceptanceCriteria}}\n- {{this}}\n{{/each}}"
+_EACH_FILE_CHANGES_BLOCK = "{{#each story.file_changes}}\n- {{this.path}} ({{this.action}})\n{{/each}}"
+_PLACEHOLDER_RE = re.compile("|".join(map(re.escape, (
+    "{{story.id}}",
+    "{{story.title}}",
+    "{{story.description}}",
+    _EACH_CRITERIA_BLOCK,
+    "{{story.acceptanceCriteria}}",
+    _EACH_FILE_CHANGES_BLOCK,
+    "{{story.dependencies}}",
+))))
+
+# JSON object/array inside a ```json or bare ``` fence
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*([\[{].*?[\]}])\s*```", re.DOTALL)
+
+
+def _s(value: Any) -> str:
+    """Text for a template field; strings pass through without a str() call, None becomes empty"""
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+
+def _get_manus_client() -> httpx.AsyncClient:
+    """Get the pooled HTTP/2 client for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _MANUS_CLIENTS.get(loop)
+    if client is None:
+        client = _MANUS_CLIENTS[loop] = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(300.0, connect=10.0),  # 5 minute timeout
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close the running event loop's shared HTTP client; call before the loop shuts down"""
+    client = _MANUS_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+@lru_cache(maxsize=32)
+def _render_context(agents_md: str, progress_txt: str, codebase: Optional[Tuple[Any, ...]]) -> str:
+    """
+    Render the project context appended to every prompt in a run.
+
+    Cached on the context values themselves: stories of one feature share
+    the same AGENTS.md/progress.txt strings, whose hashes Python caches.
+
+    Args:
+        agents_md: Project knowledge base
+        progress_txt: Recent learnings
+        codebase: (framework, language, build_command, test_command) or None
+
+    Returns:
+        Context sections to append to the prompt (may be empty)
+    """
+    parts = []
+
+    # Project knowledge base
+    if agents_md:
+        parts.append(f"\n\n## Project Knowledge Base (AGENTS.md)\n\n{agents_md}")
+
+    # Recent learnings
+    if progress_txt:
+        parts.append(f"\n\n## Recent Learnings (progress.txt)\n\n{progress_txt}")
+
+    # Codebase information
+    if codebase:
+        framework, language, build_command, test_command = codebase
+        parts.append(
+            f"\n\n## Codebase Information\n\n"
+            f"- Framework: {framework}\n"
+            f"- Language: {language}\n"
+            f"- Build Command: {build_command}\n"
+            f"- Test Command: {test_command}\n"
+        )
+
+    return "".join(parts)
+
+
+@lru_cache(maxsize=32)
+def _read_prompt_file(path: str, mtime_ns: int) -> str:
+    """Read a prompt file; mtime_ns is part of the cache key so edits are picked up"""
+    with open(path, "r") as f:
+        return f.read()
+
 
 def get_api_settings_from_db(db_session) -> Dict[str, str]:
     """
@@ -38,18 +156,19 @@ def get_api_settings_from_db(db_session) -> Dict[str, str]:
         from orchestrator.models import SystemSetting
         from orchestrator.crypto import decrypt_value
 
-        for key in ["api_provider", "claude_api_key", "manus_api_key"]:
-            setting = db_session.query(SystemSetting).filter(
-                SystemSetting.key == key
-            ).first()
-            if setting and setting.value:
+        rows = db_session.query(SystemSetting).filter(
+            SystemSetting.key.in_(API_SETTING_KEYS)
+        ).all()
+        for setting in rows:
+            if setting.value:
                 if setting.is_encrypted:
+                    # decrypt_value is memoized per ciphertext, so unchanged rows are not decrypted again
                     try:
-                        settings[key] = decrypt_value(setting.value)
+                        settings[setting.key] = decrypt_value(setting.value)
                     except Exception:
-                        settings[key] = ""
+                        settings[setting.key] = ""
                 else:
-                    settings[key] = setting.value
+                    settings[setting.key] = setting.value
     except Exception as e:
         print(f"Warning: Failed to load API settings from DB: {e}")
 
@@ -65,15 +184,13 @@ class AgentInvoker:
         self.claude_api_key = CLAUDE_API_KEY
         self.manus_api_key = MANUS_API_KEY
         self.api_base = MANUS_API_BASE
-        self.client = None
+        self._client: Optional[Anthropic] = None
+        self._client_lock = threading.Lock()
 
         # Override with database settings if available
         if db_session:
             self._load_settings_from_db(db_session)
 
-        # Initialize client based on provider
-        self._init_client()
-
     def _load_settings_from_db(self, db_session):
         """Load API settings from database"""
         settings = get_api_settings_from_db(db_session)
@@ -84,10 +201,14 @@ class AgentInvoker:
         if settings.get("manus_api_key"):
             self.manus_api_key = settings["manus_api_key"]
 
-    def _init_client(self):
-        """Initialize API client based on provider"""
-        if self.provider == "claude" and self.claude_api_key:
-            self.client = Anthropic(api_key=self.claude_api_key)
+    @property
+    def client(self) -> Optional[Anthropic]:
+        """Claude client, created once on first use so building an invoker opens no connections"""
+        if self._client is None and self.claude_api_key:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = Anthropic(api_key=self.claude_api_key)
+        return self._client
 
     def load_prompt(self, agent_name: str, db_session=None) -> str:
         """
@@ -117,6 +238,9 @@ class AgentInvoker:
         """
         Load prompt from database.
 
+        Content is cached per agent for PROMPT_CACHE_TTL seconds, then
+        revalidated with a cheap active-version query.
+
         Args:
             agent_name: Name of the agent
             db_session: SQLAlchemy session
@@ -126,6 +250,24 @@ class AgentInvoker:
         """
         try:
             from orchestrator.models import AgentPrompt
+            from sqlalchemy import func
+
+            now = time.monotonic()
+            with _db_prompt_lock:
+                cached = _DB_PROMPT_CACHE.get(agent_name)
+            if cached and now - cached[0] < PROMPT_CACHE_TTL:
+                return cached[2]
+
+            if cached:
+                # Versions are immutable, so an unchanged active version means unchanged content
+                active_version = db_session.query(func.max(AgentPrompt.version)).filter(
+                    AgentPrompt.agent_name == agent_name,
+                    AgentPrompt.is_active == True
+                ).scalar()
+                if active_version == cached[1]:
+                    with _db_prompt_lock:
+                        _DB_PROMPT_CACHE[agent_name] = (now, cached[1], cached[2])
+                    return cached[2]
 
             # Get the active prompt for this agent (latest version)
             prompt = db_session.query(AgentPrompt).filter(
@@ -134,8 +276,12 @@ class AgentInvoker:
             ).order_by(AgentPrompt.version.desc()).first()
 
             if prompt:
+                with _db_prompt_lock:
+                    _DB_PROMPT_CACHE[agent_name] = (now, prompt.version, prompt.content)
                 return prompt.content
 
+            with _db_prompt_lock:
+                _DB_PROMPT_CACHE.pop(agent_name, None)
             return None
         except ImportError:
             # Models not available
@@ -156,8 +302,7 @@ class AgentInvoker:
         """
         prompt_path = os.path.join(PROMPT_BASE_PATH, agent_name, "prompt.md")
         try:
-            with open(prompt_path, "r") as f:
-                return f.read()
+            return _read_prompt_file(prompt_path, os.stat(prompt_path).st_mtime_ns)
         except FileNotFoundError:
             raise ValueError(f"Prompt file not found for agent: {agent_name} at {prompt_path}")
 
@@ -173,63 +318,54 @@ class AgentInvoker:
         Returns:
             Populated prompt string
         """
-        prompt = prompt_template
-
         # Simple variable replacements
-        prompt = prompt.replace("{{story.id}}", str(story_data.get("story_id", "")))
-        prompt = prompt.replace("{{story.title}}", str(story_data.get("title", "")))
-        prompt = prompt.replace("{{story.description}}", str(story_data.get("description", "")))
+        subs = {
+            "{{story.id}}": _s(story_data.get("story_id")),
+            "{{story.title}}": _s(story_data.get("title")),
+            "{{story.description}}": _s(story_data.get("description")),
+        }
 
         # Handle acceptance criteria (list)
         criteria = story_data.get("acceptance_criteria", [])
         if isinstance(criteria, str):
             try:
-                criteria = json.loads(criteria)
+                criteria = _loads(criteria)
             except (json.JSONDecodeError, TypeError):
                 criteria = [criteria] if criteria else []
 
         criteria_text = "\n".join([f"- {c}" for c in criteria])
 
-        # Replace handlebars-style each block
-        prompt = prompt.replace(
-            "{{#each story.acceptanceCriteria}}\n- {{this}}\n{{/each}}",
-            criteria_text
-        )
-
-        # Also handle simpler format
-        prompt = prompt.replace("{{story.acceptanceCriteria}}", criteria_text)
+        # Handlebars-style each block, and the simpler format
+        subs[_EACH_CRITERIA_BLOCK] = criteria_text
+        subs["{{story.acceptanceCriteria}}"] = criteria_text
 
         # Handle file changes for review/qa agents
         file_changes = story_data.get("file_changes", [])
         if isinstance(file_changes, str):
             try:
-                file_changes = json.loads(file_changes)
+                file_changes = _loads(file_changes)
             except (json.JSONDecodeError, TypeError):
                 file_changes = []
 
         if file_changes:
-            files_text = "\n".join([
+            subs[_EACH_FILE_CHANGES_BLOCK] = "\n".join([
                 f"- {f.get('path', 'unknown')} ({f.get('action', 'unknown')})"
                 for f in file_changes
             ])
-            prompt = prompt.replace(
-                "{{#each story.file_changes}}\n- {{this.path}} ({{this.action}})\n{{/each}}",
-                files_text
-            )
 
         # Handle dependencies
         dependencies = story_data.get("dependencies", [])
         if isinstance(dependencies, str):
             try:
-                dependencies = json.loads(dependencies)
+                dependencies = _loads(dependencies)
             except (json.JSONDecodeError, TypeError):
                 dependencies = []
 
         if dependencies:
-            deps_text = ", ".join(dependencies)
-            prompt = prompt.replace("{{story.dependencies}}", deps_text)
+            subs["{{story.dependencies}}"] = ", ".join(dependencies)
 
-        return prompt
+        # One pass over the template; placeholders without a value are left as-is
+        return _PLACEHOLDER_RE.sub(lambda m: subs.get(m.group(0), m.group(0)), prompt_template)
 
     async def invoke_agent(
         self,
@@ -255,52 +391,83 @@ class AgentInvoker:
         prompt = self.inject_story_data(prompt_template, story_data)
 
         # Add context if provided
+        context_text = ""
         if context:
-            # Project knowledge base
-            agents_md = context.get("agents_md", "")
-            if agents_md:
-                prompt += f"\n\n## Project Knowledge Base (AGENTS.md)\n\n{agents_md}"
-
-            # Recent learnings
-            progress_txt = context.get("progress_txt", "")
-            if progress_txt:
-                prompt += f"\n\n## Recent Learnings (progress.txt)\n\n{progress_txt}"
-
-            # Codebase information
             codebase_info = context.get("codebase_info")
-            if codebase_info:
-                prompt += f"\n\n## Codebase Information\n\n"
-                prompt += f"- Framework: {codebase_info.get('framework', 'Unknown')}\n"
-                prompt += f"- Language: {codebase_info.get('language', 'Unknown')}\n"
-                prompt += f"- Build Command: {codebase_info.get('build_command', 'N/A')}\n"
-                prompt += f"- Test Command: {codebase_info.get('test_command', 'N/A')}\n"
+            context_text = _render_context(
+                context.get("agents_md", ""),
+                context.get("progress_txt", ""),
+                (
+                    codebase_info.get("framework", "Unknown"),
+                    codebase_info.get("language", "Unknown"),
+                    codebase_info.get("build_command", "N/A"),
+                    codebase_info.get("test_command", "N/A"),
+                ) if codebase_info else None
+            )
 
         # Call API based on provider
         if self.provider == "claude":
-            return await self._call_claude(prompt)
+            return await self._call_claude(prompt, context_text)
         else:
-            return await self._call_manus(prompt)
+            return await self._call_manus(prompt + context_text)
+
+    async def invoke_agents_batch(
+        self,
+        tasks: List[Tuple[str, Dict[str, Any]]],
+        context: Optional[Dict[str, Any]] = None,
+        db_session=None,
+        max_concurrency: int = 8
+    ) -> List[Any]:
+        """
+        Invoke agents for several stories concurrently.
 
-    async def _call_claude(self, prompt: str) -> Dict[str, Any]:
-        """Call Claude API"""
+        Args:
+            tasks: (agent_name, story_data) pairs
+            context: Additional context shared by all stories
+            db_session: Database session for loading prompts from DB
+            max_concurrency: Maximum in-flight API calls, to respect provider rate limits
+
+        Returns:
+            Agent responses in task order; a failed task yields its exception
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def invoke_one(agent_name: str, story_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.invoke_agent(agent_name, story_data, context, db_session)
+
+        return await asyncio.gather(
+            *[invoke_one(agent_name, story_data) for agent_name, story_data in tasks],
+            return_exceptions=True
+        )
+
+    async def _call_claude(self, prompt: str, context_text: str = "") -> Dict[str, Any]:
+        """
+        Call Claude API.
+
+        The project context is identical for every story in a run, so it is
+        sent as a leading content block marked for prompt caching; only the
+        story prompt after it varies between calls.
+        """
         try:
-            if not self.client:
-                if not self.claude_api_key:
-                    return {
-                        "error": "Claude API key not configured. Please set it in Settings.",
-                        "raw_response": None
-                    }
-                self.client = Anthropic(api_key=self.claude_api_key)
-
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=8000,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            client = self.client
+            if client is None:
+                return {
+                    "error": "Claude API key not configured. Please set it in Settings.",
+                    "raw_response": None
+                }
+
+            content = [{"type": "text", "text": prompt}]
+            if context_text:
+                content.insert(0, {
+                    "type": "text",
+                    "text": context_text.lstrip("\n"),
+                    "cache_control": {"type": "ephemeral"}
+                })
 
-            response_text = message.content[0].text
+            # The SDK client is synchronous; run it off the event loop so
+            # concurrent invocations (invoke_agents_batch) overlap
+            response_text = await asyncio.to_thread(self._stream_claude, client, content)
 
             # Parse JSON response
             return self._parse_response(response_text)
@@ -311,6 +478,17 @@ class AgentInvoker:
                 "raw_response": None
             }
 
+    def _stream_claude(self, client: Anthropic, content: List[Dict[str, Any]]) -> str:
+        """Stream a Claude reply so text is consumed as it arrives rather than buffered by the SDK"""
+        with client.messages.stream(
+            model="claude-sonnet-4-20250514",
+            max_tokens=8000,
+            messages=[
+                {"role": "user", "content": content}
+            ]
+        ) as stream:
+            return "".join(stream.text_stream)
+
     async def _call_manus(self, prompt: str) -> Dict[str, Any]:
         """Call Manus API"""
         try:
@@ -320,30 +498,33 @@ class AgentInvoker:
                     "raw_response": None
                 }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.api_base}/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.manus_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "gpt-4.1-mini",
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "max_tokens": 8000
-                    },
-                    timeout=300.0  # 5 minute timeout
-                )
-
+            async with _get_manus_client().stream(
+                "POST",
+                f"{self.api_base}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.manus_api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": "gpt-4.1-mini",
+                    "messages": [
+                        {"role": "user", "content": prompt}
+                    ],
+                    "max_tokens": 8000,
+                    "stream": True
+                }
+            ) as response:
                 response.raise_for_status()
-                data = response.json()
-
-                response_text = data["choices"][0]["message"]["content"]
+                if response.headers.get("content-type", "").startswith("text/event-stream"):
+                    response_text = await self._read_stream_content(response)
+                else:
+                    # Server ignored "stream"; fall back to the buffered body
+                    await response.aread()
+                    data = response.json()
+                    response_text = data["choices"][0]["message"]["content"]
 
-                # Parse JSON response
-                return self._parse_response(response_text)
+            # Parse JSON response
+            return self._parse_response(response_text)
 
         except Exception as e:
             return {
@@ -351,6 +532,30 @@ class AgentInvoker:
                 "raw_response": None
             }
 
+    async def _read_stream_content(self, response: httpx.Response) -> str:
+        """
+        Collect the message text from a chat completions event stream.
+
+        Args:
+            response: Streaming response with text/event-stream body
+
+        Returns:
+            Concatenated content deltas
+        """
+        parts = []
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == "[DONE]":
+                break
+            choices = _loads(payload).get("choices")
+            if choices:
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    parts.append(content)
+        return "".join(parts)
+
     def _parse_response(self, response_text: str) -> Dict[str, Any]:
         """
         Parse agent response, extracting JSON from markdown code blocks if needed.
@@ -362,23 +567,20 @@ class AgentInvoker:
             Parsed JSON dict or error dict
         """
         try:
-            # Try to extract JSON from markdown code blocks
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                if json_end > json_start:
-                    response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                # Try generic code block
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                if json_end > json_start:
-                    potential_json = response_text[json_start:json_end].strip()
-                    # Check if it looks like JSON
-                    if potential_json.startswith("{") or potential_json.startswith("["):
-                        response_text = potential_json
-
-            result = json.loads(response_text)
+            # Bare JSON reply: parse directly, so fences inside string values
+            # (e.g. markdown file contents) are never mistaken for the wrapper
+            if response_text.lstrip().startswith(("{", "[")):
+                try:
+                    return _loads(response_text)
+                except json.JSONDecodeError:
+                    pass
+
+            # Extract JSON from a markdown code block if there is one
+            match = _JSON_FENCE_RE.search(response_text)
+            if match:
+                response_text = match.group(1)
+
+            result = _loads(response_text)
             return result
 
         except json.JSONDecodeError:
@@ -388,6 +590,10 @@ class AgentInvoker:
             }
 
 
+_default_invoker: Optional[AgentInvoker] = None
+_default_invoker_lock = threading.Lock()
+
+
 def get_invoker(db_session=None) -> AgentInvoker:
     """
     Get an AgentInvoker instance, optionally with database settings.
@@ -396,10 +602,22 @@ def get_invoker(db_session=None) -> AgentInvoker:
         db_session: SQLAlchemy database session for loading settings from DB
 
     Returns:
-        AgentInvoker instance
+        AgentInvoker instance; without a session this is the shared
+        env-configured invoker, created on first use
     """
-    return AgentInvoker(db_session=db_session)
-
-
-# Global invoker instance (uses env vars only, for backward compatibility)
-invoker = AgentInvoker()
+    global _default_invoker
+    if db_session is not None:
+        return AgentInvoker(db_session=db_session)
+    if _default_invoker is None:
+        with _default_invoker_lock:
+            if _default_invoker is None:
+                _default_invoker = AgentInvoker()
+    return _default_invoker
+
+
+def __getattr__(name: str):
+    # Global invoker instance (uses env vars only, for backward compatibility),
+    # built on first access instead of at import
+    if name == "invoker":
+        return get_invoker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
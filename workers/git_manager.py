@@ -5,17 +5,135 @@ Supports authenticated operations and agent attribution
 import os
 import re
 import json
-from typing import List, Dict, Any, Optional
+import shutil
+import asyncio
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from urllib.parse import urlparse, urlunparse
-from git import Repo, GitCommandError, Actor
+from git import Repo, Git, GitCommandError, Actor
+from git.objects import Commit
+
+# HTTP transport settings for network git commands (clone, fetch, push,
+# ls-remote): negotiate HTTP/2 so a fetch's requests share one TLS
+# connection, and buffer pushes so large packs aren't sent chunked.
+# Passed through the environment, so the host's git config is untouched.
+GIT_HTTP_CONFIG = {
+    "http.version": "HTTP/2",
+    "http.postBuffer": "524288000",
+}
+
+
+def _git_config_env(config: Dict[str, str]) -> Dict[str, str]:
+    """Build GIT_CONFIG_COUNT/KEY/VALUE variables for per-command git config"""
+    env = {"GIT_CONFIG_COUNT": str(len(config))}
+    for i, (key, value) in enumerate(config.items()):
+        env[f"GIT_CONFIG_KEY_{i}"] = key
+        env[f"GIT_CONFIG_VALUE_{i}"] = value
+    return env
+
+
+GIT_HTTP_ENV = _git_config_env(GIT_HTTP_CONFIG)
+
+
+# http(s) URL without embedded credentials: scheme, host[:port], rest
+_HTTP_URL_RE = re.compile(r"^(https?)://([A-Za-z0-9.-]+(?::\d+)?)(/[^#]*)?$")
+
+# Working copies are cloned, patched, pushed and thrown away, so they are
+# kept in RAM (tmpfs) when there's room for them. REPOS_PATH overrides.
+DISK_REPOS_PATH = "/app/repos"
+TMPFS_REPOS_PATH = "/dev/shm/ralph-repos"
+TMPFS_MIN_FREE_BYTES = int(os.getenv("REPOS_TMPFS_MIN_FREE_MB", "2048")) * 1024 * 1024
+
+
+def default_base_path() -> str:
+    """
+    Pick where working copies live.
+
+    Returns:
+        REPOS_PATH if set, else the tmpfs path if /dev/shm has at least
+        REPOS_TMPFS_MIN_FREE_MB free, else the on-disk path
+    """
+    configured = os.getenv("REPOS_PATH")
+    if configured:
+        return configured
+
+    try:
+        stat = os.statvfs(os.path.dirname(TMPFS_REPOS_PATH))
+    except OSError:
+        return DISK_REPOS_PATH
+
+    if stat.f_bavail * stat.f_frsize >= TMPFS_MIN_FREE_BYTES:
+        return TMPFS_REPOS_PATH
+    return DISK_REPOS_PATH
+
+
+# Read size when streaming diff-tree output
+DIFF_CHUNK_SIZE = 64 * 1024
+
+
+def _write_file(file_path: str, content: str):
+    """Write a file with raw os calls, skipping Python's buffered IO layer"""
+    data = memoryview(content.encode("utf-8"))
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
 
 
 class GitManager:
     """Manages git operations for code repositories with authentication and attribution"""
 
-    def __init__(self, base_path: str = "/app/repos"):
+    def __init__(self, base_path: Optional[str] = None):
+        if base_path is None:
+            base_path = default_base_path()
         self.base_path = base_path
         os.makedirs(base_path, exist_ok=True)
+        # Repo handles per repo_name, reused across calls so config
+        # discovery runs once and GitPython's persistent
+        # `git cat-file --batch` processes stay alive between reads
+        self._repos: Dict[str, Repo] = {}
+        # Branch last fetched per repo by clone_repo_with_auth, so the
+        # create_branch that follows can skip fetching it again
+        self._fetched: Dict[str, str] = {}
+
+    def _repo(self, repo_name: str) -> Repo:
+        """Get the cached Repo for a repository"""
+        repo = self._repos.get(repo_name)
+        if repo is None:
+            repo = self._repos[repo_name] = self._open_repo(Repo(os.path.join(self.base_path, repo_name)))
+        return repo
+
+    @staticmethod
+    def _open_repo(repo: Repo) -> Repo:
+        """
+        Prepare a Repo for caching.
+
+        Reads don't take git's optional locks (e.g. the opportunistic index
+        refresh), so they never contend with a concurrent commit on
+        .git/index.lock. Writes still take the locks they need. Network
+        commands get GIT_HTTP_CONFIG.
+        """
+        repo.git.update_environment(GIT_OPTIONAL_LOCKS="0", **GIT_HTTP_ENV)
+        return repo
+
+    def _forget_repo(self, repo_name: str):
+        """Drop a cached Repo whose working copy is about to be replaced"""
+        repo = self._repos.pop(repo_name, None)
+        if repo is not None:
+            repo.close()
+
+    def close(self):
+        """Terminate the persistent git processes held by cached Repo handles"""
+        for repo in self._repos.values():
+            repo.close()
+        self._repos.clear()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
     def _build_authenticated_url(
         self,
@@ -37,6 +155,12 @@ class GitManager:
         if not token:
             return repo_url
 
+        # Fast path for plain https://host[:port]/path URLs
+        match = _HTTP_URL_RE.match(repo_url)
+        if match:
+            scheme, host, rest = match.groups()
+            return f"{scheme}://{username or 'oauth2'}:{token}@{host.lower()}{rest or ''}"
+
         parsed = urlparse(repo_url)
 
         # Handle HTTPS URLs
@@ -77,16 +201,22 @@ class GitManager:
         repo_url: str,
         repo_name: str,
         username: Optional[str] = None,
-        token: Optional[str] = None
+        token: Optional[str] = None,
+        branch: Optional[str] = None
     ) -> str:
         """
         Clone a repository with authentication.
 
+        New clones are partial (--filter=blob:none): history comes down
+        without file contents, and blobs are fetched on demand when a
+        commit is checked out. With a branch, only that branch is cloned.
+
         Args:
             repo_url: Git repository URL
             repo_name: Local directory name
             username: Git username (optional)
             token: Personal access token (optional)
+            branch: Only clone this branch (optional, defaults to all)
 
         Returns:
             Path to cloned repository
@@ -95,22 +225,66 @@ class GitManager:
         auth_url = self._build_authenticated_url(repo_url, username, token)
 
         if os.path.exists(repo_path):
-            # Repository already exists, update remote URL and pull
-            repo = Repo(repo_path)
+            # Repository already exists (e.g. from an earlier story on this
+            # worker): reuse it, updating the remote URL and fetching
+            repo = self._repo(repo_name)
             # Update origin URL (in case credentials changed)
-            if 'origin' in [r.name for r in repo.remotes]:
+            if 'origin' in [r.name for r in repo.remotes] and repo.remotes.origin.url != auth_url:
                 repo.remotes.origin.set_url(auth_url)
             try:
-                repo.remotes.origin.pull()
-            except GitCommandError:
-                # Ignore pull errors on existing repos
+                if branch:
+                    # Only fetch: branch may not be checked out, and
+                    # create_branch resets onto it when it is
+                    self._fetch_branch(repo, branch)
+                    self._fetched[repo_name] = branch
+                else:
+                    self._fast_sync(repo, repo.active_branch.name)
+            except (GitCommandError, TypeError):
+                # Ignore sync errors (or a detached HEAD) on existing repos
                 pass
             return repo_path
 
         # Clone repository with authenticated URL
-        Repo.clone_from(auth_url, repo_path)
+        self._forget_repo(repo_name)
+        multi_options = ["--filter=blob:none", "--no-tags"]
+        if branch:
+            multi_options += ["--single-branch", f"--branch={branch}"]
+        try:
+            self._repos[repo_name] = self._open_repo(
+                Repo.clone_from(auth_url, repo_path, multi_options=multi_options, env=GIT_HTTP_ENV)
+            )
+            if branch:
+                self._fetched[repo_name] = branch
+        except GitCommandError:
+            if not branch:
+                raise
+            # Branch doesn't exist on the remote; clone the default branch
+            if os.path.exists(repo_path):
+                shutil.rmtree(repo_path, ignore_errors=True)
+            self._repos[repo_name] = self._open_repo(Repo.clone_from(
+                auth_url, repo_path, multi_options=["--filter=blob:none", "--no-tags"], env=GIT_HTTP_ENV
+            ))
         return repo_path
 
+    def _fetch_branch(self, repo: Repo, branch: str):
+        """Update origin/<branch> from the remote"""
+        repo.git.fetch("--no-tags", "origin", f"+refs/heads/{branch}:refs/remotes/origin/{branch}")
+
+    def _fast_sync(self, repo: Repo, branch: str):
+        """
+        Reset a branch to the remote's tip.
+
+        Working copies are disposable, so instead of pull (fetch + merge)
+        this fetches the one branch and hard-resets onto it, which can't
+        stop on a merge conflict.
+
+        Args:
+            repo: Repository, with branch checked out
+            branch: Branch name
+        """
+        self._fetch_branch(repo, branch)
+        repo.git.reset("--hard", f"origin/{branch}")
+
     def create_branch(self, repo_name: str, branch_name: str, base_branch: str = "main") -> bool:
         """
         Create a new branch.
@@ -123,8 +297,7 @@ class GitManager:
         Returns:
             True if successful
         """
-        repo_path = os.path.join(self.base_path, repo_name)
-        repo = Repo(repo_path)
+        repo = self._repo(repo_name)
 
         # Checkout base branch
         try:
@@ -136,11 +309,18 @@ class GitManager:
             except GitCommandError:
                 pass  # Stay on current branch
 
-        # Pull latest
+        # Bring the base up to date with the remote. If clone_repo_with_auth
+        # just fetched this branch, origin/<base> is current and only a
+        # local reset (if any) is needed, not another fetch.
         try:
-            repo.remotes.origin.pull()
-        except GitCommandError:
-            pass  # Ignore pull errors
+            active = repo.active_branch.name
+            if self._fetched.pop(repo_name, None) == active:
+                if repo.git.rev_parse("HEAD") != repo.git.rev_parse(f"origin/{active}"):
+                    repo.git.reset("--hard", f"origin/{active}")
+            else:
+                self._fast_sync(repo, active)
+        except (GitCommandError, TypeError):
+            pass  # Ignore sync errors
 
         # Create and checkout new branch
         try:
@@ -154,6 +334,18 @@ class GitManager:
             except GitCommandError:
                 return False
 
+    def checkout_branch(self, repo_name: str, branch_name: str):
+        """
+        Check out an existing branch, if it isn't already.
+
+        Args:
+            repo_name: Repository name
+            branch_name: Branch to check out
+        """
+        repo = self._repo(repo_name)
+        if repo.head.is_detached or repo.active_branch.name != branch_name:
+            repo.git.checkout(branch_name)
+
     def apply_changes(self, repo_name: str, file_changes: List[Dict[str, Any]]) -> List[str]:
         """
         Apply file changes to repository.
@@ -168,21 +360,22 @@ class GitManager:
         repo_path = os.path.join(self.base_path, repo_name)
         modified_files = []
 
+        # Create each parent directory once rather than once per file
+        parent_dirs = {
+            os.path.dirname(os.path.join(repo_path, change["path"]))
+            for change in file_changes
+            if change["action"] in ("create", "update")
+        }
+        for parent_dir in parent_dirs:
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+
         for change in file_changes:
             file_path = os.path.join(repo_path, change["path"])
             action = change["action"]
-            content = change.get("content", "")
 
             if action == "create" or action == "update":
-                # Create parent directories if needed
-                parent_dir = os.path.dirname(file_path)
-                if parent_dir:
-                    os.makedirs(parent_dir, exist_ok=True)
-
-                # Write file content
-                with open(file_path, "w") as f:
-                    f.write(content)
-
+                _write_file(file_path, change.get("content", ""))
                 modified_files.append(change["path"])
 
             elif action == "delete":
@@ -192,6 +385,58 @@ class GitManager:
 
         return modified_files
 
+    async def apply_changes_async(self, repo_name: str, file_changes: List[Dict[str, Any]]) -> List[str]:
+        """
+        Apply file changes to repository, writing files concurrently.
+
+        Same semantics as apply_changes. Parent directories are created once
+        up front, then each file's changes run in a worker thread; changes to
+        the same path stay in order.
+
+        Args:
+            repo_name: Repository name
+            file_changes: List of file change dicts with 'path', 'action', 'content'
+
+        Returns:
+            List of modified file paths
+        """
+        repo_path = os.path.join(self.base_path, repo_name)
+
+        # Group by path so repeated changes to one file don't race
+        changes_by_path: Dict[str, List[Dict[str, Any]]] = {}
+        for change in file_changes:
+            changes_by_path.setdefault(change["path"], []).append(change)
+
+        # Create each parent directory once before dispatching writes
+        parent_dirs = {
+            os.path.dirname(os.path.join(repo_path, path))
+            for path, changes in changes_by_path.items()
+            if any(c["action"] in ("create", "update") for c in changes)
+        }
+        for parent_dir in parent_dirs:
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+
+        def apply_path(path: str, changes: List[Dict[str, Any]]) -> List[str]:
+            file_path = os.path.join(repo_path, path)
+            modified = []
+            for change in changes:
+                action = change["action"]
+                if action == "create" or action == "update":
+                    _write_file(file_path, change.get("content", ""))
+                    modified.append(path)
+                elif action == "delete":
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                        modified.append(path)
+            return modified
+
+        results = await asyncio.gather(*[
+            asyncio.to_thread(apply_path, path, changes)
+            for path, changes in changes_by_path.items()
+        ])
+        return [path for modified in results for path in modified]
+
     def commit(
         self,
         repo_name: str,
@@ -209,13 +454,11 @@ class GitManager:
         Returns:
             Commit hash
         """
-        repo_path = os.path.join(self.base_path, repo_name)
-        repo = Repo(repo_path)
+        repo = self._repo(repo_name)
 
         if files:
-            # Add specific files
-            for file_path in files:
-                repo.index.add([file_path])
+            # Add specific files in one index update
+            repo.index.add(list(files))
         else:
             # Add all changes
             repo.git.add(A=True)
@@ -257,8 +500,7 @@ class GitManager:
             - commit_message: str
             - files_changed: List[str]
         """
-        repo_path = os.path.join(self.base_path, repo_name)
-        repo = Repo(repo_path)
+        repo = self._repo(repo_name)
 
         # Create agent author identity
         agent_display_name = f"Ralph {agent_name.replace('_', ' ').title()} Agent"
@@ -279,18 +521,14 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
         # Create author/committer
         author = Actor(agent_display_name, agent_email)
 
-        # Stage files
+        # Stage files, and record what is being committed
         if files:
-            for file_path in files:
-                repo.index.add([file_path])
+            # One index read/write for all files instead of one per file
+            staged_files = list(files)
+            repo.index.add(staged_files)
         else:
             repo.git.add(A=True)
-
-        # Get list of staged files before commit
-        staged_files = [item.a_path for item in repo.index.diff("HEAD")]
-        if not staged_files:
-            # If no diff against HEAD, get untracked + modified
-            staged_files = list(repo.untracked_files) + [item.a_path for item in repo.index.diff(None)]
+            staged_files = repo.git.diff("--cached", "--name-only", "HEAD").splitlines()
 
         # Commit with author attribution
         commit = repo.index.commit(
@@ -318,8 +556,7 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
         Returns:
             True if successful
         """
-        repo_path = os.path.join(self.base_path, repo_name)
-        repo = Repo(repo_path)
+        repo = self._repo(repo_name)
 
         origin = repo.remotes.origin
 
@@ -351,8 +588,7 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
         Returns:
             True if successful
         """
-        repo_path = os.path.join(self.base_path, repo_name)
-        repo = Repo(repo_path)
+        repo = self._repo(repo_name)
 
         # Update remote URL with credentials if provided
         if token:
@@ -373,21 +609,42 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
         Returns:
             Diff text
         """
-        repo_path = os.path.join(self.base_path, repo_name)
-        repo = Repo(repo_path)
+        return b"".join(self.iter_diff(repo_name, commit_hash)).decode('utf-8', errors='replace')
 
-        commit = repo.commit(commit_hash)
-        parent = commit.parents[0] if commit.parents else None
-        diffs = commit.diff(parent, create_patch=True)
+    def iter_diff(self, repo_name: str, commit_hash: str) -> Iterator[bytes]:
+        """
+        Stream the diff for a commit as raw, undecoded chunks.
+
+        Runs a single `git diff-tree -p` against the first parent (or the
+        empty tree for a root commit) and yields its output as it's read.
+
+        Args:
+            repo_name: Repository name
+            commit_hash: Commit hash
+
+        Yields:
+            Patch bytes
+        """
+        repo = self._repo(repo_name)
+        proc = repo.git.diff_tree(
+            "-p", "--no-color", *self._diff_tree_revs(repo.commit(commit_hash)),
+            as_process=True
+        )
 
-        diff_text = ""
-        for diff in diffs:
-            diff_text += f"--- {diff.a_path}\n+++ {diff.b_path}\n"
-            if diff.diff:
-                diff_text += diff.diff.decode('utf-8', errors='replace')
-            diff_text += "\n"
+        while True:
+            chunk = proc.stdout.read(DIFF_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
 
-        return diff_text
+        proc.wait()
+
+    @staticmethod
+    def _diff_tree_revs(commit: Commit) -> List[str]:
+        """diff-tree arguments comparing a commit with its first parent"""
+        if commit.parents:
+            return [commit.parents[0].hexsha, commit.hexsha]
+        return ["--root", "--no-commit-id", commit.hexsha]
 
     def get_changed_files(self, repo_name: str, commit_hash: str) -> List[str]:
         """
@@ -400,17 +657,15 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
         Returns:
             List of file paths
         """
-        repo_path = os.path.join(self.base_path, repo_name)
-        repo = Repo(repo_path)
+        return self._commit_and_changed_files(repo_name, commit_hash)[1]
 
+    def _commit_and_changed_files(self, repo_name: str, commit_hash: str) -> Tuple[Commit, List[str]]:
+        """Resolve a commit and list paths it changed relative to its first parent"""
+        repo = self._repo(repo_name)
         commit = repo.commit(commit_hash)
+        output = repo.git.diff_tree("-r", "-z", "--name-only", *self._diff_tree_revs(commit))
 
-        if commit.parents:
-            diffs = commit.diff(commit.parents[0])
-        else:
-            diffs = commit.diff(None)
-
-        return [diff.a_path or diff.b_path for diff in diffs]
+        return commit, [path for path in output.split("\0") if path]
 
     def get_commit_info(self, repo_name: str, commit_hash: str) -> Dict[str, Any]:
         """
@@ -423,10 +678,7 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
         Returns:
             Dict with commit details
         """
-        repo_path = os.path.join(self.base_path, repo_name)
-        repo = Repo(repo_path)
-
-        commit = repo.commit(commit_hash)
+        commit, files_changed = self._commit_and_changed_files(repo_name, commit_hash)
 
         return {
             "hash": commit.hexsha,
@@ -435,7 +687,7 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
             "author_name": commit.author.name,
             "author_email": commit.author.email,
             "timestamp": commit.committed_datetime.isoformat(),
-            "files_changed": self.get_changed_files(repo_name, commit_hash)
+            "files_changed": files_changed
         }
 
     def test_connection(
@@ -455,21 +707,22 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
         Returns:
             Dict with connection test results
         """
-        import tempfile
-        import shutil
-
         auth_url = self._build_authenticated_url(repo_url, username, token)
 
-        # Create temporary directory for test clone
-        temp_dir = tempfile.mkdtemp()
-
         try:
-            # Attempt to clone with depth=1 (shallow clone for speed)
-            repo = Repo.clone_from(auth_url, temp_dir, depth=1)
-
-            # Get branch info
-            branches = [ref.name.replace('origin/', '') for ref in repo.remotes.origin.refs]
-            default_branch = repo.active_branch.name if repo.head.is_valid() else None
+            # List remote refs only; nothing is cloned or written to disk
+            output = Git().ls_remote("--symref", auth_url, env=GIT_HTTP_ENV)
+
+            branches = []
+            default_branch = None
+            for line in output.splitlines():
+                if line.startswith("ref: ") and line.endswith("\tHEAD"):
+                    # ref: refs/heads/main<TAB>HEAD
+                    default_branch = line[len("ref: "):-len("\tHEAD")].replace("refs/heads/", "", 1)
+                else:
+                    ref = line.partition("\t")[2]
+                    if ref.startswith("refs/heads/"):
+                        branches.append(ref[len("refs/heads/"):])
 
             return {
                 "success": True,
@@ -502,6 +755,3 @@ Co-authored-by: {agent_display_name} <{agent_email}>"""
                     "default_branch": None
                 }
 
-        finally:
-            # Clean up temporary directory
-            shutil.rmtree(temp_dir, ignore_errors=True)
@@ -2,21 +2,27 @@
 Quality Pipeline Coordinator
 Orchestrates multi-stage quality validation
 """
-import json
-from typing import Dict, Any, List
-from task_queue import enqueue_quality_gate, get_job_status
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+from task_queue import enqueue_quality_gates_bulk, get_job_statuses, cancel_job, wait_for_job_done
 import time
 
 
 class QualityPipeline:
     """Coordinates quality gate execution"""
     
+    # Upper bound on how long to block between job status checks
+    WAKEUP_INTERVAL = 30
+    
     def __init__(self):
         self.stages = ["code_review", "security", "qa"]
     
     def run_pipeline(self, story_id: int, file_changes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Run all quality gates in sequence
+        Run all quality gates concurrently
+        
+        The gates are independent checks over the same changes, so all of
+        them are enqueued up front. The first gate to fail stops the
+        pipeline and the gates still running are cancelled.
         
         Args:
             story_id: Story ID
@@ -25,21 +31,23 @@ class QualityPipeline:
         Returns:
             Pipeline result with status and details
         """
+        payload = {"files": file_changes}
+        print(f"Running quality gates: {', '.join(self.stages)}")
+        job_ids = dict(zip(
+            self.stages,
+            enqueue_quality_gates_bulk([(story_id, stage, payload) for stage in self.stages])
+        ))
+        
         results = {}
         
-        for stage in self.stages:
-            print(f"Running quality gate: {stage}")
-            
-            # Enqueue quality gate job
-            job_id = enqueue_quality_gate(story_id, stage, {"files": file_changes})
-            
-            # Wait for job to complete
-            status = self._wait_for_job(job_id)
-            
+        for stage, status in self._wait_for_jobs(job_ids):
             results[stage] = status
             
             # If any stage fails, stop pipeline
             if status.get("status") != "pass":
+                for other, job_id in job_ids.items():
+                    if other not in results:
+                        cancel_job(job_id)
                 return {
                     "status": "failed",
                     "failed_stage": stage,
@@ -51,45 +59,78 @@ class QualityPipeline:
             "results": results
         }
     
-    def _wait_for_job(self, job_id: str, timeout: int = 900) -> Dict[str, Any]:
+    def _wait_for_jobs(
+        self,
+        job_ids: Dict[str, str],
+        timeout: int = 900
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
         """
-        Wait for a job to complete
+        Wait for jobs to complete, yielding results as they finish
+        
+        Jobs finishing together are yielded in stage order.
         
         Args:
-            job_id: Job ID
+            job_ids: Job ID per stage
             timeout: Maximum wait time in seconds
         
-        Returns:
-            Job result
+        Yields:
+            (stage, job result) tuples
         """
         start_time = time.time()
+        pending = dict(job_ids)
         
-        while True:
-            if time.time() - start_time > timeout:
-                return {
-                    "status": "timeout",
-                    "error": "Job timed out"
-                }
-            
-            job_status = get_job_status(job_id)
-            
-            if not job_status:
-                return {
-                    "status": "error",
-                    "error": "Job not found"
-                }
+        while pending:
+            stages = list(pending)
+            job_statuses = get_job_statuses([pending[stage] for stage in stages])
+            for stage, job_status in zip(stages, job_statuses):
+                result = self._job_result(job_status)
+                if result is not None:
+                    del pending[stage]
+                    yield stage, result
             
-            if job_status["status"] == "finished":
-                return job_status.get("result", {})
+            if not pending:
+                return
             
-            elif job_status["status"] == "failed":
-                return {
-                    "status": "error",
-                    "error": job_status.get("exc_info", "Job failed")
-                }
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                for stage in pending:
+                    yield stage, {
+                        "status": "timeout",
+                        "error": "Job timed out"
+                    }
+                return
             
-            # Wait before checking again
-            time.sleep(5)
+            # Block until a job signals completion. Jobs stopped or killed
+            # without running their callback are caught by the re-check
+            # after each wake-up interval.
+            wait_for_job_done(list(pending.values()), timeout=int(min(remaining, self.WAKEUP_INTERVAL)) or 1)
+    
+    def _job_result(self, job_status: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Get the result of a job
+        
+        Args:
+            job_status: Job status from get_job_statuses
+        
+        Returns:
+            Job result, or None while the job is still pending
+        """
+        if not job_status:
+            return {
+                "status": "error",
+                "error": "Job not found"
+            }
+        
+        if job_status["status"] == "finished":
+            return job_status.get("result", {})
+        
+        elif job_status["status"] in ("failed", "stopped", "canceled"):
+            return {
+                "status": "error",
+                "error": job_status.get("exc_info", "Job failed")
+            }
+        
+        return None
 
 
 # Global pipeline instance
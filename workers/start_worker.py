@@ -4,15 +4,31 @@ Starts RQ workers for processing tasks
 """
 import os
 import sys
-from redis import Redis
-from rq import Worker, Queue
+import signal
+from rq import SimpleWorker, Queue
 
-# Redis connection
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
-REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+from task_queue import redis_conn
 
-redis_conn = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+# Import job handlers up front so GitPython, the agent invoker and the
+# database engine are loaded once per worker process, not once per job
+import workers  # noqa: F401
+
+
+class InProcessWorker(SimpleWorker):
+    """
+    SimpleWorker that never kills a work horse it does not have
+
+    rq's stop-job command calls kill_horse(), which for a SimpleWorker
+    (horse_pid 0) would SIGKILL the worker's own process group, taking
+    down every worker in the pool. Running jobs are cancelled by flag
+    instead (see task_queue.cancel_job).
+    """
+
+    def kill_horse(self, sig=signal.SIGKILL):
+        if self.horse_pid:
+            super().kill_horse(sig)
+        else:
+            self.log.warning("Ignoring request to kill job running in the worker process")
 
 
 def start_worker(queue_names: list):
@@ -24,12 +40,56 @@ def start_worker(queue_names: list):
     """
     queues = [Queue(name, connection=redis_conn) for name in queue_names]
     
-    worker = Worker(queues, connection=redis_conn)
+    # Jobs run in this process rather than a forked work horse, so
+    # imports and GitManager's cached repo handles carry across jobs
+    worker = InProcessWorker(queues, connection=redis_conn)
     
     print(f"Starting worker for queues: {', '.join(queue_names)}")
     worker.work()
 
 
+def start_worker_pool(queue_names: list, pool_size: int):
+    """
+    Fork a pool of RQ workers sharing this process's imported modules
+    
+    Children are forked after the job handlers are imported, so they
+    share those pages copy-on-write instead of importing them again.
+    
+    Args:
+        queue_names: List of queue names to listen to
+        pool_size: Number of worker processes
+    """
+    if pool_size <= 1:
+        start_worker(queue_names)
+        return
+    
+    children = []
+    for _ in range(pool_size):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                start_worker(queue_names)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    
+    def forward_signal(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+    
+    # SIGTERM comes from the container runtime and only reaches us; Ctrl+C
+    # already reaches every process in the foreground group
+    signal.signal(signal.SIGTERM, forward_signal)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    print(f"Started {pool_size} workers")
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
 if __name__ == "__main__":
     # Get worker type from command line argument
     if len(sys.argv) < 2:
@@ -54,4 +114,5 @@ if __name__ == "__main__":
         sys.exit(1)
     
     queues = queue_map[worker_type]
-    start_worker(queues)
+    pool_size = int(os.getenv("RQ_POOL_SIZE", str(os.cpu_count() or 1)))
+    start_worker_pool(queues, pool_size)
@@ -3,23 +3,106 @@ Task Queue Manager using Redis and RQ
 """
 import os
 import json
-from redis import Redis
+import math
+import time
+import uuid
+from redis import Redis, BlockingConnectionPool
 from rq import Queue
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 
 # Redis connection
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 REDIS_DB = int(os.getenv("REDIS_DB", "0"))
 
-redis_conn = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
+
+# One bounded pool shared by every queue and by the worker itself
+redis_pool = BlockingConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    max_connections=REDIS_MAX_CONNECTIONS
+)
+redis_conn = Redis(connection_pool=redis_pool)
 
 # Define queues for different worker types
-backend_queue = Queue("backend", connection=redis_conn)
-mobile_queue = Queue("mobile", connection=redis_conn)
-qa_queue = Queue("qa", connection=redis_conn)
-code_review_queue = Queue("code_review", connection=redis_conn)
-security_queue = Queue("security", connection=redis_conn)
+STORY_TIMEOUT = 1800  # 30 minute timeout per story
+GATE_TIMEOUT = 900  # 15 minute timeout per quality gate
+
+# Finished and failed jobs expire from Redis instead of accumulating
+RESULT_TTL = 3600
+FAILURE_TTL = 86400
+
+backend_queue = Queue("backend", connection=redis_conn, default_timeout=STORY_TIMEOUT)
+mobile_queue = Queue("mobile", connection=redis_conn, default_timeout=STORY_TIMEOUT)
+# qa also takes QA stories, which pass STORY_TIMEOUT explicitly
+qa_queue = Queue("qa", connection=redis_conn, default_timeout=GATE_TIMEOUT)
+code_review_queue = Queue("code_review", connection=redis_conn, default_timeout=GATE_TIMEOUT)
+security_queue = Queue("security", connection=redis_conn, default_timeout=GATE_TIMEOUT)
+
+# Queue per agent type, and per quality gate
+QUEUE_MAP: Mapping[str, Queue] = MappingProxyType({
+    "backend": backend_queue,
+    "mobile": mobile_queue,
+    "qa": qa_queue,
+    "code_review": code_review_queue,
+    "security": security_queue
+})
+GATE_MAP: Mapping[str, Queue] = MappingProxyType({
+    "code_review": code_review_queue,
+    "qa": qa_queue,
+    "security": security_queue
+})
+
+# Finished quality gate jobs push their ID onto this list so waiters can
+# BLPOP on it instead of polling job status
+JOB_DONE_KEY = "result:{job_id}"
+JOB_DONE_TTL = 3600
+
+# Stories a batch job runs at once (see enqueue_stories_batch)
+STORY_BATCH_CONCURRENCY = 8
+
+# Jobs sent per pipeline by the bulk enqueue functions
+ENQUEUE_BATCH_SIZE = 10000
+
+# Running jobs are cancelled by flag, which the job checks before writing
+# results. Workers run jobs in-process (SimpleWorker), so rq's stop
+# command has no work horse to kill.
+CANCEL_KEY = "cancel:{job_id}"
+CANCEL_TTL = 86400
+
+
+def _job_done_key(job_id: str) -> str:
+    return JOB_DONE_KEY.format(job_id=job_id)
+
+
+def notify_job_done(job, connection, *args, **kwargs):
+    """RQ success/failure callback that wakes up waiters on the job"""
+    key = _job_done_key(job.id)
+    pipe = connection.pipeline()
+    pipe.rpush(key, job.id)
+    pipe.expire(key, JOB_DONE_TTL)
+    pipe.execute()
+
+
+def wait_for_job_done(job_ids: List[str], timeout: int) -> Optional[str]:
+    """
+    Block until one of the jobs finishes
+    
+    Args:
+        job_ids: Job IDs to wait on
+        timeout: Maximum wait time in seconds
+    
+    Returns:
+        ID of the job that finished, or None on timeout
+    """
+    popped = redis_conn.blpop([_job_done_key(job_id) for job_id in job_ids], timeout=timeout)
+    if popped is None:
+        return None
+    job_id = popped[1]
+    return job_id.decode() if isinstance(job_id, bytes) else job_id
 
 
 def enqueue_story(story_id: int, story_data: Dict[str, Any], agent_type: str) -> str:
@@ -34,26 +117,21 @@ def enqueue_story(story_id: int, story_data: Dict[str, Any], agent_type: str) ->
     Returns:
         Job ID
     """
-    from workers import process_story
-    
-    queue_map = {
-        "backend": backend_queue,
-        "mobile": mobile_queue,
-        "qa": qa_queue,
-        "code_review": code_review_queue,
-        "security": security_queue
-    }
+    from workers import process_story_sync
     
-    queue = queue_map.get(agent_type)
-    if not queue:
-        raise ValueError(f"Unknown agent type: {agent_type}")
+    try:
+        queue = QUEUE_MAP[agent_type]
+    except KeyError:
+        raise ValueError(f"Unknown agent type: {agent_type}") from None
     
     job = queue.enqueue(
-        process_story,
+        process_story_sync,
         story_id=story_id,
         story_data=story_data,
         agent_type=agent_type,
-        job_timeout="30m"  # 30 minute timeout per story
+        job_timeout=STORY_TIMEOUT,
+        result_ttl=RESULT_TTL,
+        failure_ttl=FAILURE_TTL
     )
     
     return job.id
@@ -71,29 +149,168 @@ def enqueue_quality_gate(story_id: int, gate_name: str, file_changes: Dict[str,
     Returns:
         Job ID
     """
-    from workers import process_quality_gate
-    
-    queue_map = {
-        "code_review": code_review_queue,
-        "qa": qa_queue,
-        "security": security_queue
-    }
+    from workers import process_quality_gate_sync
     
-    queue = queue_map.get(gate_name)
-    if not queue:
-        raise ValueError(f"Unknown quality gate: {gate_name}")
+    try:
+        queue = GATE_MAP[gate_name]
+    except KeyError:
+        raise ValueError(f"Unknown quality gate: {gate_name}") from None
     
     job = queue.enqueue(
-        process_quality_gate,
+        process_quality_gate_sync,
         story_id=story_id,
         gate_name=gate_name,
         file_changes=file_changes,
-        job_timeout="15m"  # 15 minute timeout per quality gate
+        result_ttl=RESULT_TTL,
+        failure_ttl=FAILURE_TTL,
+        on_success=notify_job_done,
+        on_failure=notify_job_done
     )
     
     return job.id
 
 
+def enqueue_stories_bulk(items: List[Tuple[int, Dict[str, Any], str]]) -> List[str]:
+    """
+    Enqueue many stories in one Redis round trip per batch
+    
+    Args:
+        items: (story_id, story_data, agent_type) tuples
+    
+    Returns:
+        Job IDs, in the same order as items
+    """
+    from workers import process_story_sync
+    
+    jobs = []
+    for story_id, story_data, agent_type in items:
+        try:
+            queue = QUEUE_MAP[agent_type]
+        except KeyError:
+            raise ValueError(f"Unknown agent type: {agent_type}") from None
+        jobs.append((queue, Queue.prepare_data(
+            process_story_sync,
+            kwargs={
+                "story_id": story_id,
+                "story_data": story_data,
+                "agent_type": agent_type
+            },
+            timeout=STORY_TIMEOUT,
+            result_ttl=RESULT_TTL,
+            failure_ttl=FAILURE_TTL,
+            job_id=str(uuid.uuid4())
+        )))
+    
+    return _enqueue_many(jobs)
+
+
+def enqueue_stories_batch(
+    items: List[Tuple[int, Dict[str, Any], str]],
+    batch_size: int = 8,
+    max_concurrency: int = STORY_BATCH_CONCURRENCY
+) -> List[str]:
+    """
+    Enqueue stories as jobs of up to batch_size stories each
+    
+    Each job runs its stories concurrently (process_stories_batch), so a
+    worker overlaps their agent calls. A job only holds stories of one
+    agent type, and its timeout allows STORY_TIMEOUT for each round of
+    max_concurrency stories.
+    
+    Args:
+        items: (story_id, story_data, agent_type) tuples
+        batch_size: Maximum stories per job
+        max_concurrency: Maximum stories a job runs at once
+    
+    Returns:
+        Job IDs, one per batch
+    """
+    from workers import process_stories_batch_sync
+    
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for story_id, story_data, agent_type in items:
+        if agent_type not in QUEUE_MAP:
+            raise ValueError(f"Unknown agent type: {agent_type}")
+        by_type.setdefault(agent_type, []).append({
+            "story_id": story_id,
+            "story_data": story_data,
+            "agent_type": agent_type
+        })
+    
+    jobs = []
+    for agent_type, stories in by_type.items():
+        for start in range(0, len(stories), batch_size):
+            batch = stories[start:start + batch_size]
+            jobs.append((QUEUE_MAP[agent_type], Queue.prepare_data(
+                process_stories_batch_sync,
+                kwargs={"items": batch, "max_concurrency": max_concurrency},
+                timeout=STORY_TIMEOUT * math.ceil(len(batch) / max_concurrency),
+                result_ttl=RESULT_TTL,
+                failure_ttl=FAILURE_TTL,
+                job_id=str(uuid.uuid4())
+            )))
+    
+    return _enqueue_many(jobs)
+
+
+def enqueue_quality_gates_bulk(items: List[Tuple[int, str, Dict[str, Any]]]) -> List[str]:
+    """
+    Enqueue many quality gate checks in one Redis round trip per batch
+    
+    Args:
+        items: (story_id, gate_name, file_changes) tuples
+    
+    Returns:
+        Job IDs, in the same order as items
+    """
+    from workers import process_quality_gate_sync
+    
+    jobs = []
+    for story_id, gate_name, file_changes in items:
+        try:
+            queue = GATE_MAP[gate_name]
+        except KeyError:
+            raise ValueError(f"Unknown quality gate: {gate_name}") from None
+        jobs.append((queue, Queue.prepare_data(
+            process_quality_gate_sync,
+            kwargs={
+                "story_id": story_id,
+                "gate_name": gate_name,
+                "file_changes": file_changes
+            },
+            result_ttl=RESULT_TTL,
+            failure_ttl=FAILURE_TTL,
+            job_id=str(uuid.uuid4()),
+            on_success=notify_job_done,
+            on_failure=notify_job_done
+        )))
+    
+    return _enqueue_many(jobs)
+
+
+def _enqueue_many(jobs: List[Tuple[Queue, Any]]) -> List[str]:
+    """
+    Enqueue prepared jobs, sending each batch through one pipeline
+    
+    Args:
+        jobs: (queue, Queue.prepare_data(...)) pairs
+    
+    Returns:
+        Job IDs, in the same order as jobs
+    """
+    for start in range(0, len(jobs), ENQUEUE_BATCH_SIZE):
+        by_queue: Dict[str, Tuple[Queue, list]] = {}
+        for queue, job_data in jobs[start:start + ENQUEUE_BATCH_SIZE]:
+            by_queue.setdefault(queue.name, (queue, []))[1].append(job_data)
+        
+        with redis_conn.pipeline() as pipe:
+            for queue, job_datas in by_queue.values():
+                queue.enqueue_many(job_datas, pipeline=pipe)
+            pipe.execute()
+    
+    return [job_data.job_id for _, job_data in jobs]
+
+
 def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
     """
     Get status of a job
@@ -104,54 +321,173 @@ def get_job_status(job_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Job status dict or None if job not found
     """
-    from rq.job import Job
+    return get_job_statuses([job_id])[0]
+
+
+def get_job_statuses(job_ids: List[str], include_result: bool = True) -> List[Optional[Dict[str, Any]]]:
+    """
+    Get status of several jobs, fetching all job hashes in one round trip
+    
+    Args:
+        job_ids: Job IDs
+        include_result: Also load result and exc_info, which costs one more
+            read per job that has run
+    
+    Returns:
+        Job status dicts (None where a job was not found), in job_ids order
+    """
+    from rq.job import Job, JobStatus
     
+    try:
+        jobs = Job.fetch_many(job_ids, connection=redis_conn)
+    except Exception:
+        return [None] * len(job_ids)
+    
+    statuses = []
+    for job in jobs:
+        if job is None:
+            statuses.append(None)
+            continue
+        try:
+            status = {
+                "id": job.id,
+                # Status was loaded with the job hash; don't re-read it
+                "status": job.get_status(refresh=False)
+            }
+            if include_result:
+                # Only jobs that have run have a result to read
+                ran = status["status"] in (JobStatus.FINISHED, JobStatus.FAILED, JobStatus.STOPPED)
+                status["result"] = job.result if ran else None
+                status["exc_info"] = job.exc_info if ran else None
+            status.update({
+                "created_at": job.created_at.isoformat() if job.created_at else None,
+                "started_at": job.started_at.isoformat() if job.started_at else None,
+                "ended_at": job.ended_at.isoformat() if job.ended_at else None
+            })
+            statuses.append(status)
+        except Exception:
+            statuses.append(None)
+    
+    return statuses
+
+
+def cancel_job(job_id: str) -> None:
+    """
+    Cancel a job: drop it from its queue if still waiting, or flag it so
+    the job discards its results if already running
+
+    Args:
+        job_id: Job ID
+    """
+    from rq.job import Job, JobStatus
+
     try:
         job = Job.fetch(job_id, connection=redis_conn)
-        return {
-            "id": job.id,
-            "status": job.get_status(),
-            "result": job.result,
-            "exc_info": job.exc_info,
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "started_at": job.started_at.isoformat() if job.started_at else None,
-            "ended_at": job.ended_at.isoformat() if job.ended_at else None
-        }
-    except:
-        return None
+        if job.get_status() == JobStatus.STARTED:
+            redis_conn.set(CANCEL_KEY.format(job_id=job_id), 1, ex=CANCEL_TTL)
+        elif not job.is_finished and not job.is_failed:
+            job.cancel()
+    except Exception:
+        pass
+
+
+def is_cancel_requested(job_id: str) -> bool:
+    """
+    Check whether cancel_job was called for a running job
+
+    Args:
+        job_id: Job ID
+
+    Returns:
+        True if the job should stop without writing results
+    """
+    return bool(redis_conn.exists(CANCEL_KEY.format(job_id=job_id)))
 
 
 def get_queue_stats() -> Dict[str, Any]:
     """Get statistics for all queues"""
+    queues = list(QUEUE_MAP.values())
+    
+    # Registries hold job IDs scored by expiry; counting unexpired entries
+    # matches registry.count without its cleanup round trips
+    now = f"({time.time()}"
+    pipe = redis_conn.pipeline(transaction=False)
+    for queue in queues:
+        pipe.llen(queue.key)
+        pipe.zcount(queue.started_job_registry.key, now, "+inf")
+        pipe.zcount(queue.finished_job_registry.key, now, "+inf")
+        pipe.zcount(queue.failed_job_registry.key, now, "+inf")
+    counts = pipe.execute()
+    
     return {
-        "backend": {
-            "queued": len(backend_queue),
-            "started": backend_queue.started_job_registry.count,
-            "finished": backend_queue.finished_job_registry.count,
-            "failed": backend_queue.failed_job_registry.count
-        },
-        "mobile": {
-            "queued": len(mobile_queue),
-            "started": mobile_queue.started_job_registry.count,
-            "finished": mobile_queue.finished_job_registry.count,
-            "failed": mobile_queue.failed_job_registry.count
-        },
-        "qa": {
-            "queued": len(qa_queue),
-            "started": qa_queue.started_job_registry.count,
-            "finished": qa_queue.finished_job_registry.count,
-            "failed": qa_queue.failed_job_registry.count
-        },
-        "code_review": {
-            "queued": len(code_review_queue),
-            "started": code_review_queue.started_job_registry.count,
-            "finished": code_review_queue.finished_job_registry.count,
-            "failed": code_review_queue.failed_job_registry.count
-        },
-        "security": {
-            "queued": len(security_queue),
-            "started": security_queue.started_job_registry.count,
-            "finished": security_queue.finished_job_registry.count,
-            "failed": security_queue.failed_job_registry.count
+        queue.name: {
+            "queued": counts[i],
+            "started": counts[i + 1],
+            "finished": counts[i + 2],
+            "failed": counts[i + 3]
         }
+        for queue, i in zip(queues, range(0, len(counts), 4))
     }
+
+
+def get_recent_jobs(limit: int = 10) -> Dict[str, Any]:
+    """
+    Get the most recent jobs in each queue and registry
+    
+    Two round trips regardless of limit or queue count: one pipeline lists
+    job IDs, a second reads each job's summary fields.
+    
+    Args:
+        limit: Maximum jobs per queue and registry
+    
+    Returns:
+        Dict of queue name -> {queued, started, finished, failed} lists of
+        job summaries (id, status, enqueued_at, ended_at), newest first
+    """
+    from rq.job import Job
+    
+    sections = ("queued", "started", "finished", "failed")
+    if limit <= 0:
+        # A stop index of -1 would mean "to the end" to LRANGE/ZREVRANGE
+        return {queue.name: {section: [] for section in sections} for queue in QUEUE_MAP.values()}
+    
+    pipe = redis_conn.pipeline(transaction=False)
+    for queue in QUEUE_MAP.values():
+        # rq RPUSHes queued jobs, so the newest are at the tail
+        pipe.lrange(queue.key, -limit, -1)
+        pipe.zrevrange(queue.started_job_registry.key, 0, limit - 1)
+        pipe.zrevrange(queue.finished_job_registry.key, 0, limit - 1)
+        pipe.zrevrange(queue.failed_job_registry.key, 0, limit - 1)
+    id_lists = []
+    for i, ids in enumerate(pipe.execute()):
+        if i % len(sections) == 0:
+            ids = ids[::-1]  # queued slice is oldest first
+        id_lists.append([_as_text(job_id) for job_id in ids])
+    
+    pipe = redis_conn.pipeline(transaction=False)
+    for ids in id_lists:
+        for job_id in ids:
+            pipe.hmget(Job.key_for(job_id), "status", "enqueued_at", "ended_at")
+    fields = iter(pipe.execute())
+    
+    recent = {}
+    id_iter = iter(id_lists)
+    for queue in QUEUE_MAP.values():
+        recent[queue.name] = {}
+        for section in sections:
+            jobs = []
+            for job_id in next(id_iter):
+                status, enqueued_at, ended_at = next(fields)
+                jobs.append({
+                    "id": job_id,
+                    "status": _as_text(status),
+                    "enqueued_at": _as_text(enqueued_at) or None,
+                    "ended_at": _as_text(ended_at) or None
+                })
+            recent[queue.name][section] = jobs
+    
+    return recent
+
+
+def _as_text(value: Any) -> Optional[str]:
+    return value.decode() if isinstance(value, bytes) else value
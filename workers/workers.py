@@ -5,31 +5,113 @@ Enhanced with agent attribution and dynamic codebase support
 import os
 import json
 import sys
-import uuid
+import asyncio
+import atexit
+import hashlib
 from datetime import datetime
-from typing import Dict, Any, Optional
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from typing import Dict, Any, List, Optional
+from sqlalchemy import create_engine, select, update, func
+from sqlalchemy.orm import sessionmaker, joinedload
+from rq import get_current_job
+
+try:
+    # Optional C-accelerated encoder for the file changes and agent
+    # results stored on execution records
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _dumps = json.dumps
+
+# Add parent directory to path for imports (once per process; agent_invoker
+# shares the same entry)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
 
 from orchestrator.models import (
     Story, StoryHistory, AgentExecution, QualityGateResult,
-    Feature, GitCommit, Codebase, Project
+    Feature, GitCommit, Codebase, ExecutionPayload
 )
 from orchestrator.crypto import decrypt_value
-from agent_invoker import invoker
+from agent_invoker import get_invoker, close_http_clients
 from git_manager import GitManager
+from task_queue import GATE_MAP, STORY_BATCH_CONCURRENCY, is_cancel_requested
 
 # Database setup
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ralph_advanced.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
+if "sqlite" in DATABASE_URL:
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+else:
+    # Keep server connections open across jobs; check them before use and
+    # recycle them before the server or a proxy drops them
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "8")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "16")),
+        pool_pre_ping=True,
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Initialize Git manager
 git_manager = GitManager()
 
+# Serializes git work on each working copy between concurrently processed
+# stories (see process_stories_batch)
+_repo_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _repo_lock(repo_name: str) -> asyncio.Lock:
+    """Get the lock guarding a repository's working copy"""
+    lock = _repo_locks.get(repo_name)
+    if lock is None:
+        lock = _repo_locks[repo_name] = asyncio.Lock()
+    return lock
+
+
+def _new_execution_uuid() -> str:
+    """Random (version 4) UUID string, formatted straight from os.urandom"""
+    raw = bytearray(os.urandom(16))
+    raw[6] = raw[6] & 0x0F | 0x40  # version 4
+    raw[8] = raw[8] & 0x3F | 0x80  # RFC 4122 variant
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _store_payload(db, body: str) -> str:
+    """
+    Store an execution payload once per distinct content.
+
+    Stories in a feature repeat much of their input, so payloads are keyed
+    by SHA-256 and an existing row is left as is.
+
+    Args:
+        db: Database session
+        body: Payload JSON
+
+    Returns:
+        Payload hash, for AgentExecution.input_hash/output_hash
+    """
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        if db.get(ExecutionPayload, digest) is None:
+            db.add(ExecutionPayload(hash=digest, body=body))
+        return digest
+
+    db.execute(
+        dialect_insert(ExecutionPayload)
+        .values(hash=digest, body=body, created_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=["hash"])
+    )
+    return digest
+
 
 async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: str) -> Dict[str, Any]:
     """
@@ -47,24 +129,27 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
     db = SessionLocal()
 
     try:
-        # Get story from database
-        story = db.query(Story).filter(Story.id == story_id).first()
+        # Get story with its feature, project and codebase in one query
+        story = db.query(Story).options(
+            joinedload(Story.feature).joinedload(Feature.project),
+            joinedload(Story.codebase)
+        ).filter(Story.id == story_id).first()
         if not story:
             return {"error": "Story not found", "story_id": story_id}
 
         # Get feature and project
-        feature = db.query(Feature).filter(Feature.id == story.feature_id).first()
+        feature = story.feature
         if not feature:
             return {"error": "Feature not found", "story_id": story_id}
 
-        project = db.query(Project).filter(Project.id == feature.project_id).first()
+        project = feature.project
         if not project:
             return {"error": "Project not found", "story_id": story_id}
 
         # Get codebase for this story
         codebase = None
         if story.codebase_id:
-            codebase = db.query(Codebase).filter(Codebase.id == story.codebase_id).first()
+            codebase = story.codebase
         elif story.repo:
             # Try to find codebase by repo name (for backward compatibility)
             codebase = db.query(Codebase).filter(
@@ -78,7 +163,6 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
         story.started_at = datetime.utcnow()
         story.assigned_agent = f"{agent_type}_agent"
         story.attempt_count += 1
-        db.commit()
 
         # Add history entry
         history = StoryHistory(
@@ -86,19 +170,19 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
             action="implementation_started",
             agent=f"{agent_type}_agent"
         )
-        db.add(history)
-        db.commit()
 
         # Create agent execution record with UUID
-        execution_uuid = str(uuid.uuid4())
+        execution_uuid = _new_execution_uuid()
         execution = AgentExecution(
             story_id=story_id,
             agent_name=f"{agent_type}_agent",
             execution_uuid=execution_uuid,
-            input_data=json.dumps(story_data),
+            input_hash=_store_payload(db, _dumps(story_data)),
             status="running"
         )
-        db.add(execution)
+
+        # One commit for the start of the run, so the UI sees it in progress
+        db.add_all([history, execution])
         db.commit()
 
         # Build context with codebase information
@@ -126,24 +210,30 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
 
             repo_name = f"{project.id}_{codebase.name}"
             try:
-                git_manager.clone_repo_with_auth(
-                    repo_url=codebase.repo_url,
-                    repo_name=repo_name,
-                    username=codebase.git_username,
-                    token=git_token
-                )
-                # Create feature branch
-                git_manager.create_branch(
-                    repo_name=repo_name,
-                    branch_name=feature.branch_name,
-                    base_branch=codebase.default_branch
-                )
+                # Git runs in a worker thread so other stories in a batch
+                # keep running during clones and fetches
+                async with _repo_lock(repo_name):
+                    await asyncio.to_thread(
+                        git_manager.clone_repo_with_auth,
+                        repo_url=codebase.repo_url,
+                        repo_name=repo_name,
+                        username=codebase.git_username,
+                        token=git_token,
+                        branch=codebase.default_branch
+                    )
+                    # Create feature branch
+                    await asyncio.to_thread(
+                        git_manager.create_branch,
+                        repo_name=repo_name,
+                        branch_name=feature.branch_name,
+                        base_branch=codebase.default_branch
+                    )
             except Exception as e:
                 print(f"Warning: Git operations failed: {e}")
 
         # Invoke agent with db_session for prompt loading
         start_time = datetime.utcnow()
-        result = await invoker.invoke_agent(
+        result = await get_invoker().invoke_agent(
             agent_name=agent_type,
             story_data=story_data,
             context=context,
@@ -154,7 +244,6 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
         # Update execution record
         execution.completed_at = end_time
         execution.duration_seconds = int((end_time - start_time).total_seconds())
-        execution.output_data = json.dumps(result)
 
         # Extract action summary and reason from result
         action_summary = result.get("summary", f"Implemented {story.title}")
@@ -183,20 +272,26 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
             file_changes = result.get("files", [])
             if file_changes and repo_name:
                 try:
-                    # Apply changes
-                    modified_files = git_manager.apply_changes(repo_name, file_changes)
-
-                    # Commit with agent attribution
-                    commit_result = git_manager.commit_with_attribution(
-                        repo_name=repo_name,
-                        message=f"Implement: {story.title[:50]}",
-                        agent_name=agent_type,
-                        story_id=story.story_id,
-                        execution_id=execution_uuid,
-                        action_summary=action_summary,
-                        action_reason=action_reason,
-                        files=modified_files
-                    )
+                    async with _repo_lock(repo_name):
+                        # Another story may have used the working copy
+                        # while the agent ran
+                        await asyncio.to_thread(git_manager.checkout_branch, repo_name, feature.branch_name)
+
+                        # Apply changes
+                        modified_files = await git_manager.apply_changes_async(repo_name, file_changes)
+
+                        # Commit with agent attribution
+                        commit_result = await asyncio.to_thread(
+                            git_manager.commit_with_attribution,
+                            repo_name=repo_name,
+                            message=f"Implement: {story.title[:50]}",
+                            agent_name=agent_type,
+                            story_id=story.story_id,
+                            execution_id=execution_uuid,
+                            action_summary=action_summary,
+                            action_reason=action_reason,
+                            files=modified_files
+                        )
 
                     # Record commit in database
                     git_commit = GitCommit(
@@ -206,7 +301,7 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
                         codebase_id=codebase.id if codebase else None,
                         commit_hash=commit_result["commit_hash"],
                         commit_message=commit_result["commit_message"],
-                        files_changed=json.dumps(modified_files),
+                        files_changed=_dumps(modified_files),
                         agent_execution_id=execution.id,
                         agent_name=commit_result["agent_name"],
                         agent_email=commit_result["agent_email"]
@@ -225,6 +320,10 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
             )
             db.add(history)
 
+        # Written last: nothing may await between the first write of a
+        # transaction and its commit, or concurrent stories in a batch
+        # would wait on each other's SQLite write lock
+        execution.output_hash = _store_payload(db, _dumps(result))
         db.commit()
 
         return {
@@ -237,6 +336,9 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
         }
 
     except Exception as e:
+        # Discard the failed transaction's pending writes
+        db.rollback()
+
         # Update story status to failed
         story = db.query(Story).filter(Story.id == story_id).first()
         if story:
@@ -253,7 +355,40 @@ async def process_story(story_id: int, story_data: Dict[str, Any], agent_type: s
         db.close()
 
 
-async def process_quality_gate(story_id: int, gate_name: str, file_changes: Dict[str, Any]) -> Dict[str, Any]:
+async def process_stories_batch(
+    items: List[Dict[str, Any]],
+    max_concurrency: int = STORY_BATCH_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """
+    Process several stories concurrently in one job.
+
+    Agent calls spend nearly all their time waiting on the model, so while
+    one story waits another can run. Each story is processed exactly as
+    process_story would, with its own session; git work on a shared
+    working copy is serialized per repository.
+
+    Args:
+        items: Dicts with story_id, story_data and agent_type
+        max_concurrency: Maximum stories in flight at once
+
+    Returns:
+        process_story results, in the same order as items
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(item: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await process_story(item["story_id"], item["story_data"], item["agent_type"])
+
+    return list(await asyncio.gather(*[run(item) for item in items]))
+
+
+async def process_quality_gate(
+    story_id: int,
+    gate_name: str,
+    file_changes: Dict[str, Any],
+    job_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Process a quality gate check.
     Enhanced with agent attribution and execution UUID tracking.
@@ -262,6 +397,7 @@ async def process_quality_gate(story_id: int, gate_name: str, file_changes: Dict
         story_id: Database ID of the story
         gate_name: Name of the quality gate (code_review, qa, security)
         file_changes: File changes from implementation
+        job_id: RQ job ID, checked for cancellation before results are written
 
     Returns:
         Result dict with pass/fail status
@@ -275,12 +411,12 @@ async def process_quality_gate(story_id: int, gate_name: str, file_changes: Dict
             return {"error": "Story not found", "story_id": story_id}
 
         # Create agent execution record with UUID
-        execution_uuid = str(uuid.uuid4())
+        execution_uuid = _new_execution_uuid()
         execution = AgentExecution(
             story_id=story_id,
             agent_name=f"{gate_name}_agent",
             execution_uuid=execution_uuid,
-            input_data=json.dumps(file_changes),
+            input_hash=_store_payload(db, _dumps(file_changes)),
             status="running"
         )
         db.add(execution)
@@ -291,13 +427,13 @@ async def process_quality_gate(story_id: int, gate_name: str, file_changes: Dict
             "story_id": story.story_id,
             "title": story.title,
             "description": story.description,
-            "acceptance_criteria": json.loads(story.acceptance_criteria) if story.acceptance_criteria else [],
+            "acceptance_criteria": story.acceptance_criteria or [],
             "file_changes": file_changes
         }
 
         # Invoke quality gate agent with db_session
         start_time = datetime.utcnow()
-        result = await invoker.invoke_agent(
+        result = await get_invoker().invoke_agent(
             agent_name=gate_name,
             story_data=story_data,
             context={},
@@ -308,7 +444,22 @@ async def process_quality_gate(story_id: int, gate_name: str, file_changes: Dict
         # Update execution record
         execution.completed_at = end_time
         execution.duration_seconds = int((end_time - start_time).total_seconds())
-        execution.output_data = json.dumps(result)
+
+        # The pipeline already failed on another gate; leave the story alone
+        if job_id and is_cancel_requested(job_id):
+            execution.status = "cancelled"
+            db.commit()
+            return {
+                "status": "cancelled",
+                "story_id": story_id,
+                "gate_name": gate_name,
+                "execution_id": execution.id,
+                "execution_uuid": execution_uuid
+            }
+
+        # Serialized once; stored on both the execution and the gate result
+        output_json = _dumps(result)
+        execution.output_hash = _store_payload(db, output_json)
 
         # Extract action summary and reason
         action_summary = result.get("summary", f"{gate_name.replace('_', ' ').title()} review completed")
@@ -325,64 +476,39 @@ async def process_quality_gate(story_id: int, gate_name: str, file_changes: Dict
             execution.status = "failed"
             execution.error_message = result.get("issues", "Quality gate failed")
 
-        db.commit()
-
-        # Create quality gate result
+        # Record the gate result, execution update and history entry
         gate_result = QualityGateResult(
             story_id=story_id,
             gate_name=gate_name,
             status=gate_status,
-            details=json.dumps(result),
+            details=output_json,
             agent_execution_id=execution.id
         )
         db.add(gate_result)
-        db.commit()
 
-        # Update story status based on gate result
         if gate_status == "pass":
-            # Check if this is the last gate
-            if gate_name == "qa":  # Assuming qa is the last gate
-                story.status = "done"
-                story.completed_at = datetime.utcnow()
-
-                # Update feature progress
-                feature = db.query(Feature).filter(Feature.id == story.feature_id).first()
-                if feature:
-                    feature.completed_stories = db.query(Story).filter(
-                        Story.feature_id == feature.id,
-                        Story.status == "done"
-                    ).count()
-                    db.commit()
-            else:
-                # Move to next gate
-                next_gate_map = {
-                    "code_review": "testing",
-                    "security": "testing",
-                    "qa": "done"
-                }
-                story.status = next_gate_map.get(gate_name, "testing")
-
-            # Add history entry for pass
             history = StoryHistory(
                 story_id=story_id,
                 action=f"{gate_name}_passed",
                 agent=f"{gate_name}_agent"
             )
-            db.add(history)
         else:
+            # Any failed gate sends the story back, whatever the others report
             story.status = "rework"
-
-            # Add history entry for fail
             history = StoryHistory(
                 story_id=story_id,
                 action=f"{gate_name}_failed",
                 agent=f"{gate_name}_agent",
                 notes=result.get("issues", "")
             )
-            db.add(history)
-
+        db.add(history)
         db.commit()
 
+        if gate_status == "pass":
+            # Gates run concurrently; decide from every gate's result once
+            # this one is committed, so the last gate to finish sees them all
+            _advance_after_gate_pass(db, story)
+
         return {
             "status": gate_status,
             "story_id": story_id,
@@ -404,18 +530,119 @@ async def process_quality_gate(story_id: int, gate_name: str, file_changes: Dict
         db.close()
 
 
+def _advance_after_gate_pass(db, story: Story) -> None:
+    """
+    Move a story forward after one of its quality gates passed.
+
+    The story is done once the latest result of every gate in the current
+    implementation round (since story.started_at) is a pass; until then it
+    is testing. Gates finish in any order, so a pass never moves a story
+    out of done or rework, and only the transition into done recounts the
+    feature's completed stories.
+    """
+    query = select(QualityGateResult.gate_name, QualityGateResult.status).where(
+        QualityGateResult.story_id == story.id
+    )
+    if story.started_at:
+        query = query.where(QualityGateResult.timestamp >= story.started_at)
+    latest = dict(db.execute(query.order_by(QualityGateResult.id)).all())
+    all_passed = all(latest.get(gate) == "pass" for gate in GATE_MAP)
+
+    values = {"status": "done" if all_passed else "testing"}
+    if all_passed:
+        values["completed_at"] = datetime.utcnow()
+    moved = db.execute(
+        update(Story)
+        .where(Story.id == story.id, Story.status.notin_(("done", "rework")))
+        .values(**values),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+
+    # Recount done stories in one UPDATE, committed with the transition
+    if all_passed and moved and story.feature_id:
+        done_count = select(func.count(Story.id)).where(
+            Story.feature_id == story.feature_id,
+            Story.status == "done"
+        ).scalar_subquery()
+        db.execute(
+            update(Feature)
+            .where(Feature.id == story.feature_id)
+            .values(completed_stories=done_count),
+            execution_options={"synchronize_session": False}
+        )
+    db.commit()
+
+
 # ============================================================================
 # Synchronous Wrappers for RQ Workers
 # ============================================================================
 
-import asyncio
+# One event loop per worker process, reused across jobs so the agent
+# invoker's per-loop HTTP clients keep their connections warm. Created on
+# first use so each forked worker gets its own.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get this process's job event loop, creating it on first use"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def _close_loop():
+    """Close the shared HTTP clients and the job event loop"""
+    if _loop is not None and not _loop.is_closed():
+        _loop.run_until_complete(close_http_clients())
+        _loop.close()
+
+
+atexit.register(_close_loop)
+
+
+def _run_job(coro):
+    """
+    Run a job coroutine on the persistent event loop
+
+    If the job is interrupted (rq's timeout raises from SIGALRM inside
+    run_until_complete), its tasks are cancelled before re-raising, as
+    asyncio.run does; otherwise they would resume during the next job and
+    could still write results for a job rq already marked failed.
+    """
+    loop = _get_loop()
+    try:
+        return loop.run_until_complete(coro)
+    except BaseException:
+        _cancel_all_tasks(loop)
+        raise
+
+
+def _cancel_all_tasks(loop: asyncio.AbstractEventLoop):
+    """Cancel the loop's pending tasks and wait for them to finish"""
+    tasks = asyncio.all_tasks(loop)
+    if not tasks:
+        return
+    for task in tasks:
+        task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
 
 
 def process_story_sync(story_id: int, story_data: Dict[str, Any], agent_type: str) -> Dict[str, Any]:
     """Synchronous wrapper for process_story (for RQ workers)"""
-    return asyncio.run(process_story(story_id, story_data, agent_type))
+    return _run_job(process_story(story_id, story_data, agent_type))
+
+
+def process_stories_batch_sync(
+    items: List[Dict[str, Any]],
+    max_concurrency: int = STORY_BATCH_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """Synchronous wrapper for process_stories_batch (for RQ workers)"""
+    return _run_job(process_stories_batch(items, max_concurrency))
 
 
 def process_quality_gate_sync(story_id: int, gate_name: str, file_changes: Dict[str, Any]) -> Dict[str, Any]:
     """Synchronous wrapper for process_quality_gate (for RQ workers)"""
-    return asyncio.run(process_quality_gate(story_id, gate_name, file_changes))
+    job = get_current_job()
+    return _run_job(process_quality_gate(story_id, gate_name, file_changes, job_id=job.id if job else None))